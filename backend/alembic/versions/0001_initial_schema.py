@@ -0,0 +1,105 @@
+"""Initial schema, as created by the application before migrations
+
+Revision ID: 0001_initial_schema
+Revises: 
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_initial_schema'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_jobs_id', 'jobs', ['id'])
+
+    op.create_table(
+        'candidates',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('job_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.Column('email', sa.String(), nullable=True),
+        sa.Column('resume_file_path', sa.String(), nullable=True),
+        sa.Column('resume_text', sa.Text(), nullable=True),
+        sa.Column('pinecone_id', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['job_id'], ['jobs.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_candidates_id', 'candidates', ['id'])
+    op.create_index('ix_candidates_pinecone_id', 'candidates', ['pinecone_id'], unique=True)
+
+    op.create_table(
+        'evaluations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('candidate_id', sa.Integer(), nullable=False),
+        sa.Column('overall_score', sa.Float(), nullable=True),
+        sa.Column('technical_score', sa.Float(), nullable=True),
+        sa.Column('experience_score', sa.Float(), nullable=True),
+        sa.Column('education_score', sa.Float(), nullable=True),
+        sa.Column('strengths', sa.JSON(), nullable=True),
+        sa.Column('concerns', sa.JSON(), nullable=True),
+        sa.Column('recommendation', sa.String(), nullable=True),
+        sa.Column('ai_analysis', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['candidate_id'], ['candidates.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('candidate_id')
+    )
+    op.create_index('ix_evaluations_id', 'evaluations', ['id'])
+
+    op.create_table(
+        'chat_sessions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('session_id', sa.String(), nullable=False),
+        sa.Column('job_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['job_id'], ['jobs.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_chat_sessions_id', 'chat_sessions', ['id'])
+    op.create_index('ix_chat_sessions_session_id', 'chat_sessions', ['session_id'], unique=True)
+
+    op.create_table(
+        'chat_messages',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('session_id', sa.String(), nullable=False),
+        sa.Column('role', sa.String(), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('reasoning', sa.JSON(), nullable=True),
+        sa.Column('tools_used', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['session_id'], ['chat_sessions.session_id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_chat_messages_id', 'chat_messages', ['id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_chat_messages_id', table_name='chat_messages')
+    op.drop_table('chat_messages')
+    op.drop_index('ix_chat_sessions_session_id', table_name='chat_sessions')
+    op.drop_index('ix_chat_sessions_id', table_name='chat_sessions')
+    op.drop_table('chat_sessions')
+    op.drop_index('ix_evaluations_id', table_name='evaluations')
+    op.drop_table('evaluations')
+    op.drop_index('ix_candidates_pinecone_id', table_name='candidates')
+    op.drop_index('ix_candidates_id', table_name='candidates')
+    op.drop_table('candidates')
+    op.drop_index('ix_jobs_id', table_name='jobs')
+    op.drop_table('jobs')
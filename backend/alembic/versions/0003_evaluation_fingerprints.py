@@ -0,0 +1,32 @@
+"""Fingerprint columns on evaluations
+
+Revision ID: 0003_evaluation_fingerprints
+Revises: 0002_embedding_cache
+Create Date: 2026-10-17 09:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_evaluation_fingerprints'
+down_revision = '0002_embedding_cache'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('evaluations') as batch_op:
+        batch_op.add_column(sa.Column('job_description_hash', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('resume_hash', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('prompt_version', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('model', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('evaluations') as batch_op:
+        batch_op.drop_column('model')
+        batch_op.drop_column('prompt_version')
+        batch_op.drop_column('resume_hash')
+        batch_op.drop_column('job_description_hash')
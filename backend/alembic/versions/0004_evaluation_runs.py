@@ -0,0 +1,42 @@
+"""Evaluation runs table
+
+Revision ID: 0004_evaluation_runs
+Revises: 0003_evaluation_fingerprints
+Create Date: 2026-10-17 09:15:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_evaluation_runs'
+down_revision = '0003_evaluation_fingerprints'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'evaluation_runs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('job_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('total_candidates', sa.Integer(), nullable=True),
+        sa.Column('evaluated_count', sa.Integer(), nullable=True),
+        sa.Column('failed_count', sa.Integer(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['job_id'], ['jobs.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_evaluation_runs_id', 'evaluation_runs', ['id'])
+    op.create_index('ix_evaluation_runs_job_id', 'evaluation_runs', ['job_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_evaluation_runs_job_id', table_name='evaluation_runs')
+    op.drop_index('ix_evaluation_runs_id', table_name='evaluation_runs')
+    op.drop_table('evaluation_runs')
@@ -0,0 +1,26 @@
+"""Memory reset time on chat sessions
+
+Revision ID: 0005_chat_memory_cleared_at
+Revises: 0004_evaluation_runs
+Create Date: 2026-10-17 09:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_chat_memory_cleared_at'
+down_revision = '0004_evaluation_runs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('chat_sessions') as batch_op:
+        batch_op.add_column(sa.Column('memory_cleared_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('chat_sessions') as batch_op:
+        batch_op.drop_column('memory_cleared_at')
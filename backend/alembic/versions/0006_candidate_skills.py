@@ -0,0 +1,35 @@
+"""Candidate skills table
+
+Revision ID: 0006_candidate_skills
+Revises: 0005_chat_memory_cleared_at
+Create Date: 2026-10-17 09:25:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_candidate_skills'
+down_revision = '0005_chat_memory_cleared_at'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'candidate_skills',
+        sa.Column('candidate_id', sa.Integer(), nullable=False),
+        sa.Column('skill', sa.String(), nullable=False),
+        sa.Column('job_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['candidate_id'], ['candidates.id']),
+        sa.ForeignKeyConstraint(['job_id'], ['jobs.id']),
+        sa.PrimaryKeyConstraint('candidate_id', 'skill')
+    )
+    # Skill filters within a job
+    op.create_index('ix_candidate_skills_job_skill', 'candidate_skills', ['job_id', 'skill', 'candidate_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_candidate_skills_job_skill', table_name='candidate_skills')
+    op.drop_table('candidate_skills')
@@ -0,0 +1,43 @@
+"""Indexes for hot query paths
+
+Revision ID: 0007_hot_path_indexes
+Revises: 0006_candidate_skills
+Create Date: 2026-10-17 09:35:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_hot_path_indexes'
+down_revision = '0006_candidate_skills'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The indexes are also declared on the models, so a database the
+    # application created with create_all may already have them
+    # Candidates of a job (uploads, counts, reindexing, filtering)
+    op.create_index('ix_candidates_job_id_id', 'candidates', ['job_id', 'id'], if_not_exists=True)
+    # Ranking evaluations by score
+    op.create_index('ix_evaluations_overall_score', 'evaluations', ['overall_score'], if_not_exists=True)
+    # Latest / active evaluation run of a job; replaces the job_id index
+    op.create_index('ix_evaluation_runs_job_created', 'evaluation_runs', ['job_id', 'created_at'], if_not_exists=True)
+    op.drop_index('ix_evaluation_runs_job_id', table_name='evaluation_runs', if_exists=True)
+    # Session listing, overall and per job, by recent activity
+    op.create_index('ix_chat_sessions_updated', 'chat_sessions', ['updated_at', 'id'], if_not_exists=True)
+    op.create_index('ix_chat_sessions_job_updated', 'chat_sessions', ['job_id', 'updated_at', 'id'], if_not_exists=True)
+    # Chat history pages and message counts per session
+    op.create_index('ix_chat_messages_session_created', 'chat_messages', ['session_id', 'created_at', 'id'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_chat_messages_session_created', table_name='chat_messages')
+    op.drop_index('ix_chat_sessions_job_updated', table_name='chat_sessions')
+    op.drop_index('ix_chat_sessions_updated', table_name='chat_sessions')
+    op.create_index('ix_evaluation_runs_job_id', 'evaluation_runs', ['job_id'])
+    op.drop_index('ix_evaluation_runs_job_created', table_name='evaluation_runs')
+    op.drop_index('ix_evaluations_overall_score', table_name='evaluations')
+    op.drop_index('ix_candidates_job_id_id', table_name='candidates')
@@ -0,0 +1,87 @@
+"""Move resume text to a compressed side table
+
+Revision ID: 0008_compressed_resumes
+Revises: 0007_hot_path_indexes
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import zstandard
+
+
+# revision identifiers, used by Alembic.
+revision = '0008_compressed_resumes'
+down_revision = '0007_hot_path_indexes'
+branch_labels = None
+depends_on = None
+
+# Rows copied per round trip while moving resume text
+BATCH_SIZE = 500
+
+candidates = sa.table(
+    'candidates',
+    sa.column('id', sa.Integer),
+    sa.column('resume_text', sa.Text),
+)
+candidate_resumes = sa.table(
+    'candidate_resumes',
+    sa.column('candidate_id', sa.Integer),
+    sa.column('text', sa.LargeBinary),
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'candidate_resumes',
+        sa.Column('candidate_id', sa.Integer(), sa.ForeignKey('candidates.id'), primary_key=True),
+        sa.Column('text', sa.LargeBinary(), nullable=False),
+    )
+
+    conn = op.get_bind()
+    compressor = zstandard.ZstdCompressor(level=3)
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(candidates.c.id, candidates.c.resume_text)
+            .where(candidates.c.id > last_id, candidates.c.resume_text.isnot(None))
+            .order_by(candidates.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        conn.execute(candidate_resumes.insert(), [
+            {"candidate_id": row.id, "text": compressor.compress(row.resume_text.encode("utf-8"))}
+            for row in rows
+        ])
+        last_id = rows[-1].id
+
+    with op.batch_alter_table('candidates') as batch_op:
+        batch_op.drop_column('resume_text')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('candidates') as batch_op:
+        batch_op.add_column(sa.Column('resume_text', sa.Text(), nullable=True))
+
+    conn = op.get_bind()
+    decompressor = zstandard.ZstdDecompressor()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(candidate_resumes.c.candidate_id, candidate_resumes.c.text)
+            .where(candidate_resumes.c.candidate_id > last_id)
+            .order_by(candidate_resumes.c.candidate_id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            conn.execute(
+                candidates.update()
+                .where(candidates.c.id == row.candidate_id)
+                .values(resume_text=decompressor.decompress(row.text).decode("utf-8"))
+            )
+        last_id = rows[-1].candidate_id
+
+    op.drop_table('candidate_resumes')
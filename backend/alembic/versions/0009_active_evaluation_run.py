@@ -0,0 +1,41 @@
+"""One active evaluation run per job
+
+Revision ID: 0009_active_evaluation_run
+Revises: 0008_compressed_resumes
+Create Date: 2026-10-17 14:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009_active_evaluation_run'
+down_revision = '0008_compressed_resumes'
+branch_labels = None
+depends_on = None
+
+ACTIVE = "status IN ('pending', 'running')"
+
+
+def upgrade() -> None:
+    # Keep only the newest active run of each job so the index can be built
+    op.execute(
+        "UPDATE evaluation_runs "
+        "SET status = 'failed', error = 'Superseded by a newer run', finished_at = CURRENT_TIMESTAMP "
+        f"WHERE {ACTIVE} AND id NOT IN ("
+        f"SELECT MAX(id) FROM evaluation_runs WHERE {ACTIVE} GROUP BY job_id)"
+    )
+    op.create_index(
+        'ix_evaluation_runs_active_job',
+        'evaluation_runs',
+        ['job_id'],
+        unique=True,
+        postgresql_where=sa.text(ACTIVE),
+        sqlite_where=sa.text(ACTIVE),
+        if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_evaluation_runs_active_job', table_name='evaluation_runs')
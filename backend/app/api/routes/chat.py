@@ -1,147 +1,368 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import Optional, List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, Dict, Tuple
 from uuid import uuid4
 from datetime import datetime
+import asyncio
+import base64
 import json
 
-from app.services.db_service import get_db
+from app.services.db_service import get_async_db, AsyncSessionLocal
 from app.models.database import ChatSession, ChatMessage
 from app.models.schemas import (
     ChatMessageRequest,
     ChatMessageResponse,
     ChatSessionResponse,
+    ChatSessionPage,
     ChatHistoryResponse,
-    ChatHistoryMessage
+    ChatHistoryMessage,
+    ChatMessageDetails
 )
-from app.services.agent_service import create_agent
+from app.services.agent_service import create_agent, HRAgent, StreamingEventHandler
+from app.services.session_store import agent_sessions
+from app.config import settings
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
-# In-memory storage for agent instances (in production, use Redis or similar)
-agent_sessions = {}
+# Limits concurrent agent conversations in this worker
+_agent_run_slots = asyncio.Semaphore(settings.max_concurrent_agent_runs)
 
 
-@router.post("", response_model=ChatMessageResponse)
-def chat_with_agent(
-    request: ChatMessageRequest,
-    db: Session = Depends(get_db)
-):
-    """
-    Chat with the autonomous HR agent.
+def _encode_cursor(timestamp: datetime, row_id: int) -> str:
+    """Opaque keyset cursor for a (timestamp, id) position."""
+    return base64.urlsafe_b64encode(f"{timestamp.isoformat()}|{row_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Position of a cursor made by _encode_cursor; 400 if it is malformed."""
+    try:
+        timestamp, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def _rebuild_agent(db: AsyncSession, chat_session: ChatSession) -> HRAgent:
+    """Create an agent for a session with memory reloaded from its history."""
+    query = select(ChatMessage.role, ChatMessage.content).where(
+        ChatMessage.session_id == chat_session.session_id
+    )
+    if chat_session.memory_cleared_at:
+        query = query.where(ChatMessage.created_at > chat_session.memory_cleared_at)
+    recent = (await db.execute(query.order_by(
+        ChatMessage.created_at.desc(), ChatMessage.id.desc()
+    ).limit(settings.agent_session_history_limit))).all()
     
-    The agent can:
-    - Make independent decisions
-    - Use tools (search, evaluate, compare candidates)
-    - Plan multi-step workflows
-    - Reason about candidate evaluation
-    """
-    # Get or create session
-    session_id = request.session_id
-    if not session_id:
-        session_id = str(uuid4())
+    def build() -> HRAgent:
+        agent = create_agent(job_id=chat_session.job_id)
+        agent.load_history([
+            {"role": role, "content": content}
+            for role, content in reversed(recent)
+        ])
+        return agent
     
-    # Get or create chat session in DB
-    chat_session = db.query(ChatSession).filter(
+    # Building the agent and summarizing long histories call out to OpenAI
+    return await run_in_threadpool(build)
+
+
+async def _get_or_create_chat_session(db: AsyncSession, session_id: str, job_id: Optional[int]) -> ChatSession:
+    """Get the chat session row, creating it on the first message."""
+    chat_session = await db.scalar(select(ChatSession).where(
         ChatSession.session_id == session_id
-    ).first()
+    ))
     
     if not chat_session:
         chat_session = ChatSession(
             session_id=session_id,
-            job_id=request.job_id
+            job_id=job_id
         )
         db.add(chat_session)
-        db.commit()
-        db.refresh(chat_session)
-    
-    # Get or create agent instance
-    if session_id not in agent_sessions:
-        agent_sessions[session_id] = create_agent(
-            db=db,
-            job_id=request.job_id
-        )
-    
-    agent = agent_sessions[session_id]
+        await db.commit()
+        await db.refresh(chat_session)
     
+    return chat_session
+
+
+async def _save_exchange(db: AsyncSession, chat_session: ChatSession, message: str, result: Dict):
+    """Persist a user message and the agent's response."""
     # Save user message
-    user_message = ChatMessage(
-        session_id=session_id,
+    db.add(ChatMessage(
+        session_id=chat_session.session_id,
         role="user",
-        content=request.message
-    )
-    db.add(user_message)
-    
-    # Get agent response
-    result = agent.chat(request.message)
+        content=message
+    ))
     
     # Save agent response
-    agent_message = ChatMessage(
-        session_id=session_id,
+    db.add(ChatMessage(
+        session_id=chat_session.session_id,
         role="agent",
         content=result["response"],
         reasoning=result.get("reasoning"),
         tools_used=result.get("tools_used", [])
-    )
-    db.add(agent_message)
+    ))
     
     # Update session
     chat_session.updated_at = datetime.utcnow()
     
-    db.commit()
-    
+    await db.commit()
+
+
+def _chat_response(session_id: str, result: Dict) -> ChatMessageResponse:
     return ChatMessageResponse(
         response=result["response"],
         reasoning=result.get("reasoning", []),
         tools_used=result.get("tools_used", []),
         success=result.get("success", True),
         session_id=session_id,
-        error=result.get("error")
+        error=result.get("error"),
+        metrics=result.get("metrics")
+    )
+
+
+async def _acquire_agent_run_slot():
+    """Wait for a free agent run slot, or fail with 503 when none frees up in time."""
+    try:
+        await asyncio.wait_for(
+            _agent_run_slots.acquire(),
+            timeout=settings.agent_run_queue_timeout_seconds
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail="The agent is busy, please try again shortly")
+
+
+@router.post("", response_model=ChatMessageResponse)
+async def chat_with_agent(
+    request: ChatMessageRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Chat with the autonomous HR agent.
+    
+    The agent can:
+    - Make independent decisions
+    - Use tools (search, evaluate, compare candidates)
+    - Plan multi-step workflows
+    - Reason about candidate evaluation
+    
+    The agent runs on the event loop, so waiting on GPT-4 does not hold a
+    threadpool thread. At most max_concurrent_agent_runs conversations
+    run at once per worker; others wait for a slot.
+    """
+    # Get or create session
+    session_id = request.session_id
+    if not session_id:
+        session_id = str(uuid4())
+    
+    chat_session = await _get_or_create_chat_session(db, session_id, request.job_id)
+    
+    # Get cached agent, or rebuild it from the stored conversation
+    agent = await agent_sessions.aget_or_create(
+        session_id,
+        lambda: _rebuild_agent(db, chat_session),
+        memory_version=chat_session.memory_cleared_at
+    )
+    # End the read transaction so no connection is held while the agent runs
+    await db.commit()
+    
+    # Get agent response
+    await _acquire_agent_run_slot()
+    try:
+        result = await agent.achat(request.message)
+    finally:
+        _agent_run_slots.release()
+    
+    # Save user message and agent response
+    await _save_exchange(db, chat_session, request.message, result)
+    agent_sessions.touch(session_id)
+    
+    return _chat_response(session_id, result)
+
+
+@router.post("/stream")
+async def chat_with_agent_stream(
+    request: ChatMessageRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Chat with the HR agent, streaming progress as Server-Sent Events.
+    
+    Events:
+    - session: the session ID, sent first
+    - token: an LLM token as it is generated
+    - tool_start / tool_end: a tool call and its (truncated) output
+    - final: the complete response, same shape as POST /api/chat
+    
+    The agent runs as a task on the event loop and takes one of the
+    max_concurrent_agent_runs slots, like POST /api/chat. It is cancelled
+    if the client disconnects.
+    """
+    session_id = request.session_id
+    if not session_id:
+        session_id = str(uuid4())
+    
+    chat_session = await _get_or_create_chat_session(db, session_id, request.job_id)
+    agent = await agent_sessions.aget_or_create(
+        session_id,
+        lambda: _rebuild_agent(db, chat_session),
+        memory_version=chat_session.memory_cleared_at
+    )
+    # End the read transaction so no connection is held while the agent runs
+    await db.commit()
+    
+    await _acquire_agent_run_slot()
+    
+    handler = StreamingEventHandler()
+    handler.emit("session", {"session_id": session_id})
+    
+    async def run_agent():
+        try:
+            result = await agent.achat(request.message, callbacks=[handler])
+            # The request's session may already be closed
+            async with AsyncSessionLocal() as worker_db:
+                worker_session = await worker_db.scalar(select(ChatSession).where(
+                    ChatSession.session_id == session_id
+                ))
+                await _save_exchange(worker_db, worker_session, request.message, result)
+            agent_sessions.touch(session_id)
+            handler.emit("final", _chat_response(session_id, result).model_dump())
+        except Exception as e:
+            handler.emit("error", {"error": str(e)})
+        finally:
+            handler.finish()
+    
+    task = asyncio.create_task(run_agent())
+    # Frees the slot however the task ends, even if cancelled before it started
+    task.add_done_callback(lambda _: _agent_run_slots.release())
+    
+    async def event_stream():
+        try:
+            async for event, data in handler.events():
+                yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+        finally:
+            # Client went away (or the run finished): stop the agent
+            task.cancel()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
 
 @router.get("/sessions/{session_id}", response_model=ChatHistoryResponse)
-def get_chat_history(
+async def get_chat_history(
     session_id: str,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    include_details: bool = True,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get chat history for a session."""
-    session = db.query(ChatSession).filter(
+    """
+    Get chat history for a session, a page at a time.
+    
+    The first page holds the latest messages; pass next_cursor as cursor
+    to load older ones. Messages within a page are oldest first. With
+    include_details=false, reasoning and tools_used are left out and can
+    be fetched per message from /sessions/{session_id}/messages/{message_id}.
+    """
+    session = await db.scalar(select(ChatSession.id).where(
         ChatSession.session_id == session_id
-    ).first()
+    ))
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    messages = db.query(ChatMessage).filter(
-        ChatMessage.session_id == session_id
-    ).order_by(ChatMessage.created_at).all()
+    columns = [ChatMessage.id, ChatMessage.role, ChatMessage.content, ChatMessage.created_at]
+    if include_details:
+        columns += [ChatMessage.reasoning, ChatMessage.tools_used]
+    
+    query = select(*columns).where(ChatMessage.session_id == session_id)
+    if cursor:
+        created_at, message_id = _decode_cursor(cursor)
+        query = query.where(
+            tuple_(ChatMessage.created_at, ChatMessage.id) < tuple_(created_at, message_id)
+        )
+    
+    rows = (await db.execute(query.order_by(
+        ChatMessage.created_at.desc(), ChatMessage.id.desc()
+    ).limit(limit + 1))).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].created_at, rows[-1].id)
     
     return ChatHistoryResponse(
         session_id=session_id,
         messages=[
             ChatHistoryMessage(
-                id=msg.id,
-                role=msg.role,
-                content=msg.content,
-                reasoning=msg.reasoning,
-                tools_used=msg.tools_used,
-                created_at=msg.created_at
+                id=row.id,
+                role=row.role,
+                content=row.content,
+                reasoning=row.reasoning if include_details else None,
+                tools_used=row.tools_used if include_details else None,
+                created_at=row.created_at
             )
-            for msg in messages
-        ]
+            for row in reversed(rows)
+        ],
+        next_cursor=next_cursor
+    )
+
+
+@router.get("/sessions/{session_id}/messages/{message_id}", response_model=ChatMessageDetails)
+async def get_chat_message_details(
+    session_id: str,
+    message_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the reasoning and tools used for one message."""
+    message = (await db.execute(select(
+        ChatMessage.id, ChatMessage.reasoning, ChatMessage.tools_used
+    ).where(
+        ChatMessage.id == message_id,
+        ChatMessage.session_id == session_id
+    ))).first()
+    
+    if not message:
+        raise HTTPException(status_code=404, detail="Message not found")
+    
+    return ChatMessageDetails(
+        id=message.id,
+        reasoning=message.reasoning,
+        tools_used=message.tools_used
     )
 
 
 @router.post("/sessions/{session_id}/clear")
-def clear_chat_session(
+async def clear_chat_session(
     session_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Clear chat session memory."""
+    """
+    Clear chat session memory.
+    
+    Agents cached by other workers are rebuilt on their next turn, when
+    they see the new memory_cleared_at.
+    """
+    # Keep cleared messages out of memory when the session is rebuilt
+    cleared_at = datetime.utcnow()
+    chat_session = await db.scalar(select(ChatSession).where(
+        ChatSession.session_id == session_id
+    ))
+    if chat_session:
+        chat_session.memory_cleared_at = cleared_at
+        await db.commit()
+    
     # Clear agent memory
-    if session_id in agent_sessions:
-        agent_sessions[session_id].clear_memory()
+    agent = agent_sessions.get(session_id)
+    if agent:
+        agent.clear_memory()
+        if chat_session:
+            agent_sessions.set_memory_version(session_id, cleared_at)
+        agent_sessions.touch(session_id)
     
     # Optionally delete messages from DB
     # db.query(ChatMessage).filter(ChatMessage.session_id == session_id).delete()
@@ -150,30 +371,55 @@ def clear_chat_session(
     return {"status": "cleared", "session_id": session_id}
 
 
-@router.get("/sessions", response_model=List[ChatSessionResponse])
-def list_chat_sessions(
+@router.get("/sessions", response_model=ChatSessionPage)
+async def list_chat_sessions(
     job_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """List all chat sessions, optionally filtered by job_id."""
-    query = db.query(ChatSession)
+    """
+    List chat sessions, most recently active first, optionally filtered by job_id.
+    
+    Results are paginated by keyset on (updated_at, id): pass next_cursor
+    from a page as cursor to get the following page.
+    """
+    query = select(ChatSession)
     if job_id:
-        query = query.filter(ChatSession.job_id == job_id)
+        query = query.where(ChatSession.job_id == job_id)
+    if cursor:
+        updated_at, session_pk = _decode_cursor(cursor)
+        query = query.where(
+            tuple_(ChatSession.updated_at, ChatSession.id) < tuple_(updated_at, session_pk)
+        )
     
-    sessions = query.order_by(ChatSession.updated_at.desc()).all()
+    sessions = (await db.scalars(query.order_by(
+        ChatSession.updated_at.desc(), ChatSession.id.desc()
+    ).limit(limit + 1))).all()
     
-    result = []
-    for session in sessions:
-        message_count = db.query(ChatMessage).filter(
-            ChatMessage.session_id == session.session_id
-        ).count()
-        
-        result.append(ChatSessionResponse(
-            session_id=session.session_id,
-            job_id=session.job_id,
-            created_at=session.created_at,
-            message_count=message_count
-        ))
+    next_cursor = None
+    if len(sessions) > limit:
+        sessions = sessions[:limit]
+        next_cursor = _encode_cursor(sessions[-1].updated_at, sessions[-1].id)
     
-    return result
-
+    # Message counts for the whole page in one grouped query
+    counts = {}
+    if sessions:
+        counts = dict((await db.execute(select(
+            ChatMessage.session_id, func.count(ChatMessage.id)
+        ).where(
+            ChatMessage.session_id.in_([session.session_id for session in sessions])
+        ).group_by(ChatMessage.session_id))).all())
+    
+    return ChatSessionPage(
+        sessions=[
+            ChatSessionResponse(
+                session_id=session.session_id,
+                job_id=session.job_id,
+                created_at=session.created_at,
+                message_count=counts.get(session.session_id, 0)
+            )
+            for session in sessions
+        ],
+        next_cursor=next_cursor
+    )
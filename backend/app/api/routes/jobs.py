@@ -1,35 +1,55 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, Optional
 import os
 import shutil
 from uuid import uuid4
 
-from app.services.db_service import get_db
-from app.models.database import Job, Candidate
-from app.models.schemas import JobCreate, JobResponse, CandidateResponse, TopCandidatesResponse, EvaluationStatusResponse
-from app.services.resume_parser import extract_text_from_pdf, extract_name_from_resume, extract_email_from_resume
+from app.services.db_service import get_async_db
+from app.models.database import Job, Candidate, Evaluation, EvaluationRun
+from app.models.schemas import (
+    JobCreate,
+    JobResponse,
+    CandidateResponse,
+    EvaluationResponse,
+    TopCandidatesResponse,
+    EvaluationStatusResponse,
+    EvaluationRunResponse,
+    CandidateMatch,
+    CandidateFilterResponse
+)
+from app.services.resume_parser import parse_resumes
 from app.services.retrieval import retrieval_service
-from app.services.rag_service import RAGService
+from app.services.evaluation_runner import start_evaluation_run, get_latest_run
+from app.services.skill_index import index_candidate_skills, reindex_job_skills, filter_candidates
 from app.config import settings
 
 router = APIRouter(prefix="/api/jobs", tags=["jobs"])
 
 
+async def _count_candidates(db: AsyncSession, job_id: int) -> int:
+    return await db.scalar(
+        select(func.count()).select_from(Candidate).where(Candidate.job_id == job_id)
+    )
+
+
 @router.post("", response_model=JobResponse)
-def create_job(job: JobCreate, db: Session = Depends(get_db)):
+async def create_job(job: JobCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new job posting."""
     db_job = Job(title=job.title, description=job.description)
     db.add(db_job)
-    db.commit()
-    db.refresh(db_job)
+    await db.commit()
+    await db.refresh(db_job)
     return db_job
 
 
 @router.get("/{job_id}", response_model=JobResponse)
-def get_job(job_id: int, db: Session = Depends(get_db)):
+async def get_job(job_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get job details."""
-    job = db.query(Job).filter(Job.id == job_id).first()
+    job = await db.get(Job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     return job
@@ -39,11 +59,11 @@ def get_job(job_id: int, db: Session = Depends(get_db)):
 async def upload_resumes(
     job_id: int,
     files: List[UploadFile] = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Upload multiple resume files for a job."""
     # Verify job exists
-    job = db.query(Job).filter(Job.id == job_id).first()
+    job = await db.get(Job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
@@ -53,11 +73,15 @@ async def upload_resumes(
     
     uploaded_count = 0
     candidates_created = []
+    failed = []
     
+    # Save files first so they can be parsed in parallel
+    saved_files = []
     for file in files:
         try:
             # Validate file type
             if not file.filename.endswith('.pdf'):
+                failed.append({"filename": file.filename, "error": "Only PDF files are supported"})
                 continue
             
             # Save file
@@ -68,95 +92,236 @@ async def upload_resumes(
             with open(file_path, "wb") as buffer:
                 shutil.copyfileobj(file.file, buffer)
             
-            # Parse PDF
-            resume_text = extract_text_from_pdf(file_path)
-            if not resume_text:
-                os.remove(file_path)
-                continue
-            
-            # Extract metadata
-            name = extract_name_from_resume(resume_text)
-            email = extract_email_from_resume(resume_text)
-            
-            # Create candidate record
-            candidate = Candidate(
-                job_id=job_id,
-                name=name,
-                email=email,
-                resume_file_path=file_path,
-                resume_text=resume_text
-            )
-            db.add(candidate)
-            db.flush()  # Get candidate ID
-            
-            # Store embedding in Pinecone
-            try:
-                pinecone_id = retrieval_service.upsert_resume(
-                    candidate_id=candidate.id,
-                    resume_text=resume_text,
-                    metadata={
-                        "job_id": job_id,
-                        "name": name or "",
-                        "email": email or ""
+            saved_files.append((file.filename, file_path))
+        except Exception as e:
+            print(f"Error saving file {file.filename}: {e}")
+            failed.append({"filename": file.filename, "error": str(e)})
+    
+    # Parse PDFs across the process pool
+    parsed = await parse_resumes([file_path for _, file_path in saved_files])
+    
+    new_candidates = []
+    skills_by_file = {}
+    for (filename, file_path), result in zip(saved_files, parsed):
+        resume_text = result["text"]
+        if result["error"] or not resume_text:
+            os.remove(file_path)
+            failed.append({"filename": filename, "error": result["error"] or "No text could be extracted"})
+            continue
+        
+        # Create candidate record
+        candidate = Candidate(
+            job_id=job_id,
+            name=result["name"],
+            email=result["email"],
+            resume_file_path=file_path,
+            resume_text=resume_text
+        )
+        new_candidates.append((filename, candidate))
+        skills_by_file[file_path] = result["skills"]
+    
+    if new_candidates:
+        try:
+            db.add_all([candidate for _, candidate in new_candidates])
+            await db.flush()  # Get candidate IDs
+            await db.run_sync(index_candidate_skills, [
+                (candidate, skills_by_file[candidate.resume_file_path])
+                for _, candidate in new_candidates
+            ])
+            # Commit before embedding so no connection is held meanwhile
+            await db.commit()
+        except Exception as e:
+            print(f"Error creating candidates: {e}")
+            await db.rollback()
+            failed.extend({"filename": filename, "error": str(e)} for filename, _ in new_candidates)
+            new_candidates = []
+    
+    if new_candidates:
+        # Store embeddings in the vector store with batched embedding calls
+        try:
+            pinecone_ids = await run_in_threadpool(retrieval_service.upsert_resumes, [
+                {
+                    "candidate_id": candidate.id,
+                    "resume_text": candidate.resume_text,
+                    "metadata": {
+                        "name": candidate.name or "",
+                        "email": candidate.email or ""
                     }
-                )
+                }
+                for _, candidate in new_candidates
+            ], job_id=job_id)
+            for (_, candidate), pinecone_id in zip(new_candidates, pinecone_ids):
                 candidate.pinecone_id = pinecone_id
-            except Exception as e:
-                print(f"Warning: Could not store in Pinecone: {e}")
-            
-            db.commit()
-            candidates_created.append(candidate.id)
-            uploaded_count += 1
-            
+            await db.commit()
         except Exception as e:
-            print(f"Error processing file {file.filename}: {e}")
-            continue
+            print(f"Warning: Could not store in vector store: {e}")
+        
+        candidates_created = [candidate.id for _, candidate in new_candidates]
+        uploaded_count = len(candidates_created)
     
     return {
         "uploaded": uploaded_count,
         "job_id": job_id,
-        "candidate_ids": candidates_created
+        "candidate_ids": candidates_created,
+        "failed": failed
     }
 
 
+@router.post("/{job_id}/reindex")
+async def reindex_job(job_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Move a job's resume vectors into its job-scoped namespace and rebuild its skill index."""
+    job = await db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    candidates = (await db.scalars(select(Candidate).options(
+        selectinload(Candidate.resume)
+    ).where(Candidate.job_id == job_id))).all()
+    if not candidates:
+        return {"job_id": job_id, "reindexed": 0}
+    # End the read transaction so no connection is held while vectors move
+    await db.commit()
+    
+    try:
+        pinecone_ids = await run_in_threadpool(retrieval_service.reindex_job, job_id, [
+            {
+                "candidate_id": candidate.id,
+                "resume_text": candidate.resume_text or "",
+                "pinecone_id": candidate.pinecone_id,
+                "metadata": {
+                    "name": candidate.name or "",
+                    "email": candidate.email or ""
+                }
+            }
+            for candidate in candidates
+        ])
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    
+    for candidate, pinecone_id in zip(candidates, pinecone_ids):
+        candidate.pinecone_id = pinecone_id
+    await db.run_sync(reindex_job_skills, job_id)
+    await db.commit()
+    
+    return {"job_id": job_id, "reindexed": len(candidates)}
+
+
+@router.get("/{job_id}/candidates", response_model=CandidateFilterResponse)
+async def search_job_candidates(
+    job_id: int,
+    skills: Optional[str] = Query(None, description="Comma-separated skills the candidate must all have"),
+    min_score: Optional[float] = Query(None, ge=0, le=100),
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Filter a job's candidates by skills and minimum overall score."""
+    job = await db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    required, matches = await db.run_sync(
+        filter_candidates,
+        job_id,
+        skills=skills.split(",") if skills else None,
+        min_score=min_score,
+        limit=limit
+    )
+    
+    return CandidateFilterResponse(
+        job_id=job_id,
+        skills=required,
+        min_score=min_score,
+        count=len(matches),
+        candidates=[CandidateMatch(**match) for match in matches]
+    )
+
+
 @router.post("/{job_id}/evaluate", response_model=EvaluationStatusResponse)
-def evaluate_candidates(job_id: int, db: Session = Depends(get_db)):
-    """Trigger RAG evaluation for all candidates of a job."""
+async def evaluate_candidates(job_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Start a background RAG evaluation run for all candidates of a job."""
     # Verify job exists
-    job = db.query(Job).filter(Job.id == job_id).first()
+    job = await db.get(Job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
     # Check if candidates exist
-    candidate_count = db.query(Candidate).filter(Candidate.job_id == job_id).count()
+    candidate_count = await _count_candidates(db, job_id)
     if candidate_count == 0:
         raise HTTPException(status_code=400, detail="No candidates found for this job")
     
+    run = await db.run_sync(start_evaluation_run, job_id)
+    
     return {
         "job_id": job_id,
-        "status": "processing",
-        "message": f"Evaluation started for {candidate_count} candidates. Use GET /api/jobs/{job_id}/top-candidates to get results."
+        "status": run.status,
+        "run_id": run.id,
+        "message": f"Evaluation run {run.id} is {run.status} for {candidate_count} candidates. Use GET /api/jobs/{job_id}/evaluation-runs/{run.id} to follow progress and GET /api/jobs/{job_id}/top-candidates to get results."
     }
 
 
+@router.get("/{job_id}/evaluation-runs/latest", response_model=EvaluationRunResponse)
+async def get_latest_evaluation_run(job_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get the most recent evaluation run for a job."""
+    run = await db.run_sync(get_latest_run, job_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="No evaluation runs for this job")
+    return run
+
+
+@router.get("/{job_id}/evaluation-runs/{run_id}", response_model=EvaluationRunResponse)
+async def get_evaluation_run(job_id: int, run_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get the status and progress of an evaluation run."""
+    run = await db.scalar(select(EvaluationRun).where(
+        EvaluationRun.id == run_id,
+        EvaluationRun.job_id == job_id
+    ))
+    if not run:
+        raise HTTPException(status_code=404, detail="Evaluation run not found")
+    return run
+
+
 @router.get("/{job_id}/top-candidates", response_model=TopCandidatesResponse)
-def get_top_candidates(job_id: int, db: Session = Depends(get_db)):
-    """Get top 5 candidates after RAG evaluation."""
+async def get_top_candidates(job_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get top 5 candidates from stored RAG evaluations."""
     # Verify job exists
-    job = db.query(Job).filter(Job.id == job_id).first()
+    job = await db.get(Job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    # Run RAG evaluation
-    rag_service = RAGService(db)
-    top_5 = rag_service.evaluate_job_candidates(job_id=job_id, top_k=15)
-    
     # Get total candidate count
-    total_candidates = db.query(Candidate).filter(Candidate.job_id == job_id).count()
+    total_candidates = await _count_candidates(db, job_id)
+    
+    # Serve stored evaluations; the LLM work happens in evaluation runs
+    rows = (await db.execute(select(Evaluation, Candidate.name).join(
+        Candidate, Evaluation.candidate_id == Candidate.id
+    ).where(
+        Candidate.job_id == job_id
+    ).order_by(Evaluation.overall_score.desc()).limit(5))).all()
+    
+    latest_run = await db.run_sync(get_latest_run, job_id)
+    if not rows and not latest_run and total_candidates > 0:
+        # First visit for this job: evaluate in the background
+        latest_run = await db.run_sync(start_evaluation_run, job_id)
+    
+    top_5 = [
+        EvaluationResponse(
+            candidate_id=evaluation.candidate_id,
+            candidate_name=name or "Unknown",
+            overall_score=evaluation.overall_score,
+            technical_score=evaluation.technical_score,
+            experience_score=evaluation.experience_score,
+            education_score=evaluation.education_score,
+            strengths=evaluation.strengths or [],
+            concerns=evaluation.concerns or [],
+            recommendation=evaluation.recommendation,
+            ai_analysis=evaluation.ai_analysis
+        )
+        for evaluation, name in rows
+    ]
     
     return {
         "job_id": job_id,
         "total_candidates": total_candidates,
-        "top_5": top_5
+        "top_5": top_5,
+        "evaluation_status": latest_run.status if latest_run else None
     }
-
@@ -6,13 +6,55 @@ class Settings(BaseSettings):
     # OpenAI
     openai_api_key: str
     
+    # Vector store
+    vector_store_backend: str = "pinecone"  # "pinecone" or "local"
+    local_vector_store_dir: str = "./vector_store"
+    local_vector_store_dtype: str = "float32"  # "float32", "float16" or "int8"
+    
     # Pinecone
-    pinecone_api_key: str
+    pinecone_api_key: Optional[str] = None
     pinecone_environment: str = "us-east-1"
     pinecone_index_name: str = "hr-agent-resumes"
+    vector_legacy_fallback: bool = True  # Also search pre-namespace vectors for jobs not yet reindexed
+    
+    # Embeddings
+    embedding_batch_max_tokens: int = 100000  # Estimated tokens per embeddings request
+    embedding_batch_max_inputs: int = 512
+    embedding_cache_size: int = 4096  # In-process LRU entries
+    embedding_cache_persist: bool = True  # Also cache in the embedding_cache table
+    
+    # Evaluation
+    evaluation_concurrency: int = 5  # Parallel GPT-4 evaluations per request
+    evaluation_top_k: int = 15  # Candidates retrieved for evaluation
+    evaluation_run_workers: int = 2  # Background evaluation runs executed at once
+    evaluation_run_stale_seconds: int = 3600  # Active runs older than this are marked failed
+    
+    # Agent sessions
+    agent_session_max: int = 200  # Agent instances kept in memory per worker
+    agent_session_ttl_seconds: int = 1800  # Idle time before a session is evicted
+    agent_session_max_memory_mb: int = 256  # Budget for conversation memory across sessions
+    agent_session_history_limit: int = 50  # Messages reloaded when rebuilding a session
+    max_concurrent_agent_runs: int = 32  # Agent conversations running at once per worker
+    agent_run_queue_timeout_seconds: int = 30  # Wait for a free slot before returning 503
+    agent_memory_mode: str = "summary"  # "summary" (rolling summary + recent turns) or "buffer" (full history)
+    agent_memory_max_tokens: int = 2000  # Verbatim history budget in summary mode
+    agent_memory_max_turns: int = 10  # Recent turns kept verbatim in summary mode
+    tool_observation_max_tokens: int = 1000  # Cap on each tool result added to the scratchpad
+    tool_expand_max_tokens: int = 4000  # Cap on expand_ref results (full resumes, descriptions)
+    agent_tool_memo_ttl_seconds: int = 300  # How long a session reuses a tool result
+    agent_tool_memo_max_entries: int = 128  # Tool results cached per session
     
     # Database
     database_url: str
+    db_pool_size: int = 10  # Connections kept open per worker
+    db_max_overflow: int = 20  # Extra connections allowed under burst load
+    db_pool_timeout: int = 30  # Seconds to wait for a free connection
+    db_pool_recycle: int = 1800  # Replace connections older than this (seconds)
+    db_pool_pre_ping: bool = True  # Check connections before use
+    async_database_url: Optional[str] = None  # Defaults to database_url with an async driver (asyncpg)
+    db_async_pool_size: int = 10  # Connections kept open per worker by the API's async engine
+    db_async_max_overflow: int = 20  # Extra async connections allowed under burst load
+    db_async_pool_recycle: int = 1800  # Replace async connections older than this (seconds)
     
     # Application
     secret_key: str
@@ -20,6 +62,12 @@ class Settings(BaseSettings):
     upload_dir: str = "./uploads"
     max_file_size: int = 10485760  # 10MB
     
+    # Resume parsing
+    parse_workers: Optional[int] = None  # Defaults to os.cpu_count()
+    parse_timeout_seconds: int = 60
+    parse_memory_limit_mb: int = 1024
+    skill_taxonomy_path: Optional[str] = None  # JSON {skill: [aliases]}; defaults to the built-in taxonomy
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -1,7 +1,12 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.routes import jobs, chat
-from app.services.db_service import init_db
+from app.services.db_service import init_db, async_engine
+from app.services.resume_parser import shutdown_parse_pool
+from app.services.evaluation_runner import shutdown_evaluation_runner
+from app.services.embedding_cache import embedding_cache
+from app.services.session_store import agent_sessions
+from app.services.metrics import metrics
 import os
 
 app = FastAPI(
@@ -32,6 +37,15 @@ def startup_event():
     init_db()
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Stop resume parsing workers and background evaluations
+    shutdown_parse_pool()
+    shutdown_evaluation_runner()
+    # Close pooled async connections
+    await async_engine.dispose()
+
+
 @app.get("/")
 def root():
     return {"message": "HR Agent API", "version": "1.0.0"}
@@ -41,3 +55,11 @@ def root():
 def health_check():
     return {"status": "healthy"}
 
+
+@app.get("/metrics")
+def get_metrics():
+    return {
+        "embedding_cache": embedding_cache.stats(),
+        "agent_sessions": agent_sessions.stats(),
+        **metrics.snapshot()
+    }
@@ -1,4 +1,4 @@
-from .database import Base, Job, Candidate, Evaluation
+from .database import Base, Job, Candidate, CandidateResume, CandidateSkill, Evaluation, EvaluationRun
 from .schemas import (
     JobCreate,
     JobResponse,
@@ -6,14 +6,20 @@ from .schemas import (
     EvaluationResponse,
     TopCandidatesResponse,
     EvaluationRequest,
-    EvaluationStatusResponse
+    EvaluationStatusResponse,
+    EvaluationRunResponse,
+    CandidateMatch,
+    CandidateFilterResponse
 )
 
 __all__ = [
     "Base",
     "Job",
     "Candidate",
+    "CandidateResume",
+    "CandidateSkill",
     "Evaluation",
+    "EvaluationRun",
     "JobCreate",
     "JobResponse",
     "CandidateResponse",
@@ -21,5 +27,8 @@ __all__ = [
     "TopCandidatesResponse",
     "EvaluationRequest",
     "EvaluationStatusResponse",
+    "EvaluationRunResponse",
+    "CandidateMatch",
+    "CandidateFilterResponse",
 ]
 
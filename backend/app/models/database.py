@@ -1,11 +1,36 @@
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, JSON, LargeBinary, Index, text
+from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
+from sqlalchemy.types import TypeDecorator
 from datetime import datetime
+import zstandard
 
 Base = declarative_base()
 
 
+class CompressedText(TypeDecorator):
+    """Text stored zstd-compressed in a binary column."""
+    
+    impl = LargeBinary
+    cache_ok = True
+    
+    def __init__(self, level: int = 3):
+        super().__init__()
+        self.level = level
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        # Compressor objects are not thread-safe, so one is made per value
+        return zstandard.ZstdCompressor(level=self.level).compress(value.encode("utf-8"))
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return zstandard.ZstdDecompressor().decompress(value).decode("utf-8")
+
+
 class Job(Base):
     __tablename__ = "jobs"
     
@@ -25,12 +50,30 @@ class Candidate(Base):
     name = Column(String)
     email = Column(String)
     resume_file_path = Column(String)
-    resume_text = Column(Text)
     pinecone_id = Column(String, unique=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     job = relationship("Job", back_populates="candidates")
     evaluation = relationship("Evaluation", back_populates="candidate", uselist=False, cascade="all, delete-orphan")
+    skills = relationship("CandidateSkill", back_populates="candidate", cascade="all, delete-orphan")
+    # Loaded only when resume_text is used; bulk readers should selectinload(Candidate.resume)
+    resume = relationship("CandidateResume", back_populates="candidate", uselist=False, cascade="all, delete-orphan")
+    
+    resume_text = association_proxy("resume", "text", creator=lambda text: CandidateResume(text=text))
+    
+    __table_args__ = (
+        # A job's candidates
+        Index("ix_candidates_job_id_id", "job_id", "id"),
+    )
+
+
+class CandidateResume(Base):
+    __tablename__ = "candidate_resumes"
+    
+    candidate_id = Column(Integer, ForeignKey("candidates.id"), primary_key=True)
+    text = Column(CompressedText, nullable=False)
+    
+    candidate = relationship("Candidate", back_populates="resume")
 
 
 class Evaluation(Base):
@@ -46,9 +89,62 @@ class Evaluation(Base):
     concerns = Column(JSON)
     recommendation = Column(String)
     ai_analysis = Column(Text)
+    # Fingerprint of the inputs, used to reuse evaluations that are still fresh
+    job_description_hash = Column(String(64))
+    resume_hash = Column(String(64))
+    prompt_version = Column(String)
+    model = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     candidate = relationship("Candidate", back_populates="evaluation")
+    
+    __table_args__ = (
+        # Ranking a job's evaluations
+        Index("ix_evaluations_overall_score", "overall_score"),
+    )
+
+
+class CandidateSkill(Base):
+    __tablename__ = "candidate_skills"
+    
+    candidate_id = Column(Integer, ForeignKey("candidates.id"), primary_key=True)
+    skill = Column(String, primary_key=True)  # Canonical name from the skill taxonomy
+    job_id = Column(Integer, ForeignKey("jobs.id"), nullable=False)  # Denormalized for per-job skill lookups
+    
+    candidate = relationship("Candidate", back_populates="skills")
+    
+    __table_args__ = (
+        Index("ix_candidate_skills_job_skill", "job_id", "skill", "candidate_id"),
+    )
+
+
+class EvaluationRun(Base):
+    __tablename__ = "evaluation_runs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("jobs.id"), nullable=False)
+    status = Column(String, nullable=False, default="pending")  # 'pending', 'running', 'completed' or 'failed'
+    total_candidates = Column(Integer, default=0)
+    evaluated_count = Column(Integer, default=0)
+    failed_count = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        # Latest and active run lookups per job
+        Index("ix_evaluation_runs_job_created", "job_id", "created_at"),
+        # At most one pending or running run per job, even when two
+        # requests start a run at the same time
+        Index(
+            "ix_evaluation_runs_active_job",
+            "job_id",
+            unique=True,
+            postgresql_where=text("status IN ('pending', 'running')"),
+            sqlite_where=text("status IN ('pending', 'running')")
+        ),
+    )
 
 
 class ChatSession(Base):
@@ -59,8 +155,15 @@ class ChatSession(Base):
     job_id = Column(Integer, ForeignKey("jobs.id"), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    memory_cleared_at = Column(DateTime, nullable=True)  # Messages before this are not reloaded into agent memory
     
     messages = relationship("ChatMessage", back_populates="session", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        # Keyset pagination of the session list, overall and per job
+        Index("ix_chat_sessions_updated", "updated_at", "id"),
+        Index("ix_chat_sessions_job_updated", "job_id", "updated_at", "id"),
+    )
 
 
 class ChatMessage(Base):
@@ -75,4 +178,18 @@ class ChatMessage(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     session = relationship("ChatSession", back_populates="messages")
+    
+    __table_args__ = (
+        # Keyset pagination of a session's history; also serves per-session counts
+        Index("ix_chat_messages_session_created", "session_id", "created_at", "id"),
+    )
 
+
+class EmbeddingCacheEntry(Base):
+    __tablename__ = "embedding_cache"
+    
+    model = Column(String, primary_key=True)
+    content_hash = Column(String(64), primary_key=True)  # SHA-256 of the normalized text
+    dimensions = Column(Integer, nullable=False)
+    embedding = Column(LargeBinary, nullable=False)  # float32 vector bytes
+    created_at = Column(DateTime, default=datetime.utcnow)
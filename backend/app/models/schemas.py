@@ -46,6 +46,7 @@ class TopCandidatesResponse(BaseModel):
     job_id: int
     total_candidates: int
     top_5: List[EvaluationResponse]
+    evaluation_status: Optional[str] = None  # Status of the latest evaluation run
 
 
 class EvaluationRequest(BaseModel):
@@ -56,6 +57,40 @@ class EvaluationStatusResponse(BaseModel):
     job_id: int
     status: str
     message: str
+    run_id: Optional[int] = None
+
+
+class EvaluationRunResponse(BaseModel):
+    id: int
+    job_id: int
+    status: str
+    total_candidates: int
+    evaluated_count: int
+    failed_count: int
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class CandidateMatch(BaseModel):
+    candidate_id: int
+    name: Optional[str]
+    email: Optional[str]
+    overall_score: Optional[float] = None
+    recommendation: Optional[str] = None
+    skills: List[str]
+
+
+class CandidateFilterResponse(BaseModel):
+    job_id: int
+    skills: List[str]  # Canonical names of the requested skills
+    min_score: Optional[float] = None
+    count: int
+    candidates: List[CandidateMatch]
 
 
 # Chat schemas
@@ -78,6 +113,7 @@ class ChatMessageResponse(BaseModel):
     success: bool
     session_id: str
     error: Optional[str] = None
+    metrics: Optional[Dict[str, int]] = None
 
 
 class ChatSessionResponse(BaseModel):
@@ -90,6 +126,11 @@ class ChatSessionResponse(BaseModel):
         from_attributes = True
 
 
+class ChatSessionPage(BaseModel):
+    sessions: List[ChatSessionResponse]
+    next_cursor: Optional[str] = None  # Pass as cursor to get the next page; None on the last page
+
+
 class ChatHistoryMessage(BaseModel):
     id: int
     role: str
@@ -105,3 +146,10 @@ class ChatHistoryMessage(BaseModel):
 class ChatHistoryResponse(BaseModel):
     session_id: str
     messages: List[ChatHistoryMessage]
+    next_cursor: Optional[str] = None  # Pass as cursor to load older messages; None when there are none
+
+
+class ChatMessageDetails(BaseModel):
+    id: int
+    reasoning: Optional[List[Dict[str, Any]]] = None
+    tools_used: Optional[List[str]] = None
@@ -1,11 +1,26 @@
-from langchain.agents import AgentExecutor, create_react_agent
+from langchain.agents import AgentExecutor, create_openai_tools_agent
+from langchain.agents.format_scratchpad.openai_tools import format_to_openai_tool_messages
 from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain.memory import ConversationBufferMemory
-from sqlalchemy.orm import Session
-from typing import Dict, Optional
+from langchain.memory import ConversationBufferMemory, ConversationSummaryBufferMemory
+from langchain_core.agents import AgentAction
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.memory import BaseMemory
+from langchain_core.messages import BaseMessage
+from langchain_core.tools import BaseTool
+from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+import inspect
 import json
-from app.services.agent_tools import create_tools_with_db
+import sys
+import threading
+from app.services.agent_tools import create_agent_tools
+from app.services.db_service import SessionLocal
+from app.services.intent_router import intent_router
+from app.services.metrics import metrics
+from app.services.tool_memo import ToolMemo, current_tool_memo
 from app.config import settings
 
 AGENT_PROMPT = """You are an autonomous HR recruitment agent with advanced capabilities. You help HR professionals find and evaluate the best candidates for job openings using intelligent reasoning and tool usage.
@@ -22,11 +37,7 @@ AGENT_PROMPT = """You are an autonomous HR recruitment agent with advanced capab
    - Provide recommendations
 
 3. **Tool Usage**: You have access to powerful tools:
-   - search_candidates: Find candidates using semantic vector search
-   - evaluate_candidate: Perform detailed GPT-4 evaluation with scoring
-   - compare_candidates: Compare multiple candidates side by side
-   - get_job_details: Retrieve job posting information
-   - filter_candidates: Apply filters to candidate lists
+{tools}
 
 4. **Conversational**: Engage naturally with users, explain your reasoning, and answer questions about candidates.
 
@@ -45,13 +56,13 @@ When given a task:
 **Examples:**
 
 User: "Find me the best 5 candidates for job #1"
-- Plan: Get job details → Search candidates → Evaluate top candidates → Rank → Return top 5
-- Execute: Use get_job_details, then search_candidates, then evaluate_candidate for top matches
+- Plan: Screen the job → Review the ranked shortlist → Return top 5
+- Execute: Use screen_job_db once; it evaluates candidates in parallel and ranks them
 - Return: Top 5 with scores and explanations
 
 User: "Why is candidate #42 a good fit?"
 - Plan: Get candidate evaluation → Explain strengths → Reference job requirements
-- Execute: Use evaluate_candidate or check existing evaluation
+- Execute: Use evaluate_candidate_db; it reuses an up-to-date stored evaluation
 - Return: Detailed explanation of fit
 
 **Important Guidelines:**
@@ -61,119 +72,417 @@ User: "Why is candidate #42 a good fit?"
 - Be transparent about your process
 - If you need more information, ask the user
 
-Previous conversation:
-{chat_history}
+Think step by step, use tools when needed, and provide a helpful response."""
 
-Current task: {input}
 
-Think step by step, use tools when needed, and provide a helpful response:"""
+def describe_tools(tools: List[BaseTool]) -> str:
+    """
+    List tools for the system prompt, one "- name: summary" line each.
+    
+    Built from the tool objects so the prompt always names the tools
+    that are actually registered.
+    """
+    lines = []
+    for tool in tools:
+        summary = (inspect.getdoc(tool.func) or tool.description).strip().splitlines()[0]
+        lines.append(f"   - {tool.name}: {summary}")
+    return "\n".join(lines)
 
 
-class HRAgent:
-    """Autonomous HR Agent using LangChain with ReAct pattern."""
+def count_message_tokens(llm: ChatOpenAI, messages: List[BaseMessage]) -> int:
+    """Count prompt tokens for messages, estimating when no tokenizer is available."""
+    if not messages:
+        return 0
+    try:
+        return llm.get_num_tokens_from_messages(messages)
+    except Exception:
+        # ~4 characters per token plus per-message overhead
+        return sum(len(str(message.content)) // 4 + 4 for message in messages)
+
+
+class RollingSummaryMemory(ConversationSummaryBufferMemory):
+    """
+    Conversation memory with a bounded verbatim window.
     
-    def __init__(self, db: Session, job_id: Optional[int] = None):
-        self.db = db
-        self.job_id = job_id
+    The last max_turns turns are kept as messages as long as they fit in
+    max_token_limit tokens; older turns are folded into a running summary
+    that is extended (not regenerated) each time turns drop out of the
+    window. The history sent to the model therefore stays roughly constant
+    in size however long the conversation runs.
+    """
+    
+    max_turns: int = 10
+    
+    def prune(self) -> None:
+        """Move the oldest turns into the summary until the window fits."""
+        buffer = self.chat_memory.messages
+        pruned = []
+        while buffer and (
+            len(buffer) > self.max_turns * 2
+            or count_message_tokens(self.llm, buffer) > self.max_token_limit
+        ):
+            # Drop a whole turn: the user message and the reply to it
+            pruned.append(buffer.pop(0))
+            if buffer and buffer[0].type == "ai":
+                pruned.append(buffer.pop(0))
+        
+        if pruned:
+            self.moving_summary_buffer = self.predict_new_summary(
+                pruned, self.moving_summary_buffer
+            )
+            metrics.increment("agent.memory_summarizations")
+
+
+class AgentRuntime:
+    """
+    Process-wide agent components shared by every chat session.
+    
+    The LLM client (and its HTTP connection pool), the prompt, the tool
+    definitions and the executor are built once. Sessions only hold their
+    own memory and job context and pass them in on each run.
+    """
+    
+    def __init__(self, session_factory: sessionmaker = SessionLocal):
         self.llm = ChatOpenAI(
             model="gpt-4-turbo-preview",
             temperature=0.3,
+            streaming=True,  # Lets callbacks receive tokens as they are generated
             api_key=settings.openai_api_key
         )
-        self.memory = ConversationBufferMemory(
-            memory_key="chat_history",
-            return_messages=True,
-            output_key="output"
+        self.tools = create_agent_tools(session_factory)
+        # Braces in tool summaries are literal text, not prompt variables
+        system_prompt = AGENT_PROMPT.format(
+            tools=describe_tools(self.tools).replace("{", "{{").replace("}", "}}")
         )
-        self.tools = create_tools_with_db(db)
-        self.agent_executor = self._create_agent()
-    
-    def _create_agent(self) -> AgentExecutor:
-        """Create ReAct agent with tools and memory."""
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", AGENT_PROMPT),
+        self.prompt = ChatPromptTemplate.from_messages([
+            ("system", system_prompt),
             MessagesPlaceholder(variable_name="chat_history"),
             ("human", "{input}"),
             MessagesPlaceholder(variable_name="agent_scratchpad"),
         ])
-        
-        agent = create_react_agent(
+        self.agent_executor = self._create_executor()
+    
+    def _create_executor(self) -> AgentExecutor:
+        """Create the tool-calling agent executor (without memory)."""
+        agent = create_openai_tools_agent(
             llm=self.llm,
             tools=self.tools,
-            prompt=prompt
+            prompt=self.prompt
         )
         
-        executor = AgentExecutor(
+        return AgentExecutor(
             agent=agent,
             tools=self.tools,
-            memory=self.memory,
             verbose=True,
             max_iterations=10,
             handle_parsing_errors=True,
             return_intermediate_steps=True
         )
-        
-        return executor
+
+
+_runtime: Optional[AgentRuntime] = None
+_runtime_lock = threading.Lock()
+
+
+def get_agent_runtime() -> AgentRuntime:
+    """Get the shared agent runtime, building it on first use."""
+    global _runtime
+    if _runtime is None:
+        with _runtime_lock:
+            if _runtime is None:
+                _runtime = AgentRuntime()
+    return _runtime
+
+
+class HRAgent:
+    """Autonomous HR Agent session: conversation memory and job context on a shared runtime."""
+    
+    def __init__(self, job_id: Optional[int] = None, runtime: Optional[AgentRuntime] = None):
+        self.job_id = job_id
+        self.runtime = runtime or get_agent_runtime()
+        self.memory = self._create_memory()
+        self.tool_memo = ToolMemo(
+            ttl_seconds=settings.agent_tool_memo_ttl_seconds,
+            max_entries=settings.agent_tool_memo_max_entries
+        )
+    
+    def _create_memory(self) -> BaseMemory:
+        """Build conversation memory for settings.agent_memory_mode."""
+        if settings.agent_memory_mode == "buffer":
+            return ConversationBufferMemory(
+                memory_key="chat_history",
+                return_messages=True,
+                input_key="input",
+                output_key="output"
+            )
+        if settings.agent_memory_mode == "summary":
+            return RollingSummaryMemory(
+                llm=self.runtime.llm,
+                max_token_limit=settings.agent_memory_max_tokens,
+                max_turns=settings.agent_memory_max_turns,
+                memory_key="chat_history",
+                return_messages=True,
+                input_key="input",
+                output_key="output"
+            )
+        raise ValueError(f"Unknown agent memory mode: {settings.agent_memory_mode}")
     
-    def chat(self, message: str) -> Dict:
+    def chat(self, message: str, callbacks: Optional[List[BaseCallbackHandler]] = None) -> Dict:
         """
         Process a message through the agent.
         
         Args:
             message: User message
+            callbacks: Optional LangChain callback handlers for this run
         
         Returns:
             Dictionary with response, reasoning, and tool usage
         """
         try:
-            # Add job context if available
-            if self.job_id:
-                message = f"[Job ID: {self.job_id}] {message}"
+            inputs = self._build_inputs(message)
+            
+            # Structured requests are answered without the agent loop
+            routed = intent_router.route(message, self.job_id)
+            if routed:
+                result = self._routed_output(routed)
+                self._remember(inputs, result)
+                return self._format_result(result)
             
-            # Run agent
-            result = self.agent_executor.invoke({"input": message})
+            turn_metrics = self._measure_prompt(inputs)
             
-            # Extract information
-            response = result.get("output", "")
-            intermediate_steps = result.get("intermediate_steps", [])
+            # Run agent; tools reuse this session's earlier results
+            memo_token = current_tool_memo.set(self.tool_memo)
+            try:
+                result = self.runtime.agent_executor.invoke(
+                    inputs,
+                    config={"callbacks": callbacks} if callbacks else None
+                )
+            finally:
+                current_tool_memo.reset(memo_token)
+            self._remember(inputs, result)
+            return self._format_result(result, turn_metrics)
+        except Exception as e:
+            return self._error_result(e)
+    
+    async def achat(self, message: str, callbacks: Optional[List[BaseCallbackHandler]] = None) -> Dict:
+        """
+        Process a message through the agent without blocking the event loop.
+        
+        LLM calls use the async OpenAI client and tools run in worker
+        threads, so an in-flight conversation does not pin a thread while
+        waiting on GPT-4.
+        
+        Args:
+            message: User message
+            callbacks: Optional LangChain callback handlers for this run
+        
+        Returns:
+            Dictionary with response, reasoning, and tool usage
+        """
+        try:
+            inputs = self._build_inputs(message)
             
-            # Extract tools used
-            tools_used = []
-            reasoning = []
+            # Structured requests are answered without the agent loop
+            routed = await asyncio.to_thread(intent_router.route, message, self.job_id)
+            if routed:
+                result = self._routed_output(routed)
+                await run_in_threadpool(self.memory.save_context, *self._turn_context(inputs, result))
+                return self._format_result(result)
             
-            for step in intermediate_steps:
-                action = step[0]
-                observation = step[1]
-                
-                if hasattr(action, 'tool'):
-                    tools_used.append(action.tool)
-                    reasoning.append({
-                        "tool": action.tool,
-                        "input": action.tool_input,
-                        "output": str(observation)[:500]  # Limit length
-                    })
+            turn_metrics = self._measure_prompt(inputs)
             
-            return {
-                "response": response,
-                "reasoning": reasoning,
-                "tools_used": tools_used,
-                "success": True
-            }
+            # Run agent; tools reuse this session's earlier results
+            memo_token = current_tool_memo.set(self.tool_memo)
+            try:
+                result = await self.runtime.agent_executor.ainvoke(
+                    inputs,
+                    config={"callbacks": callbacks} if callbacks else None
+                )
+            finally:
+                current_tool_memo.reset(memo_token)
+            # Summarizing can call the LLM, so keep it off the event loop
+            await run_in_threadpool(self.memory.save_context, *self._turn_context(inputs, result))
+            return self._format_result(result, turn_metrics)
         except Exception as e:
-            return {
-                "response": f"I encountered an error: {str(e)}",
-                "reasoning": [],
-                "tools_used": [],
-                "success": False,
-                "error": str(e)
+            return self._error_result(e)
+    
+    def _build_inputs(self, message: str) -> Dict:
+        """Executor inputs: the message with job context plus this session's history."""
+        # Add job context if available
+        if self.job_id:
+            message = f"[Job ID: {self.job_id}] {message}"
+        
+        return {
+            "input": message,
+            **self.memory.load_memory_variables({})
+        }
+    
+    def _measure_prompt(self, inputs: Dict) -> Dict[str, int]:
+        """
+        Count the tokens this turn sends before any tool calls.
+        
+        prompt_tokens covers the system prompt, history and message;
+        history_tokens is the part contributed by memory.
+        """
+        llm = self.runtime.llm
+        history_tokens = count_message_tokens(llm, inputs["chat_history"])
+        prompt_tokens = count_message_tokens(
+            llm,
+            self.runtime.prompt.format_messages(**inputs, agent_scratchpad=[])
+        )
+        metrics.observe("agent.prompt_tokens", prompt_tokens)
+        metrics.observe("agent.history_tokens", history_tokens)
+        return {"prompt_tokens": prompt_tokens, "history_tokens": history_tokens}
+    
+    def _routed_output(self, routed: Dict) -> Dict:
+        """Shape a fast-path answer like an executor result."""
+        step = AgentAction(
+            tool=f"fast_path:{routed['intent']}",
+            tool_input=routed["arguments"],
+            log=""
+        )
+        return {
+            "output": routed["response"],
+            "intermediate_steps": [(step, routed["response"])]
+        }
+    
+    def _turn_context(self, inputs: Dict, result: Dict) -> Tuple[Dict, Dict]:
+        return {"input": inputs["input"]}, {"output": result.get("output", "")}
+    
+    def _remember(self, inputs: Dict, result: Dict):
+        """Save the turn to this session's memory."""
+        self.memory.save_context(*self._turn_context(inputs, result))
+    
+    def _format_result(self, result: Dict, turn_metrics: Optional[Dict[str, int]] = None) -> Dict:
+        """Extract the response, reasoning and tool usage from an agent run."""
+        response = result.get("output", "")
+        intermediate_steps = result.get("intermediate_steps", [])
+        
+        if turn_metrics is not None:
+            # Tool calls and observations re-sent with every LLM call of the turn
+            scratchpad_tokens = count_message_tokens(
+                self.runtime.llm,
+                format_to_openai_tool_messages(intermediate_steps)
+            )
+            metrics.observe("agent.scratchpad_tokens", scratchpad_tokens)
+            turn_metrics = {
+                **turn_metrics,
+                "scratchpad_tokens": scratchpad_tokens,
+                "tool_calls": len(intermediate_steps)
             }
+        
+        # Extract tools used
+        tools_used = []
+        reasoning = []
+        
+        for step in intermediate_steps:
+            action = step[0]
+            observation = step[1]
+            
+            if hasattr(action, 'tool'):
+                tools_used.append(action.tool)
+                reasoning.append({
+                    "tool": action.tool,
+                    "input": action.tool_input,
+                    "output": str(observation)[:500]  # Limit length
+                })
+        
+        return {
+            "response": response,
+            "reasoning": reasoning,
+            "tools_used": tools_used,
+            "success": True,
+            "metrics": turn_metrics
+        }
+    
+    def _error_result(self, error: Exception) -> Dict:
+        return {
+            "response": f"I encountered an error: {str(error)}",
+            "reasoning": [],
+            "tools_used": [],
+            "success": False,
+            "error": str(error)
+        }
     
     def clear_memory(self):
-        """Clear conversation memory."""
+        """Clear conversation memory and cached tool results."""
         self.memory.clear()
+        self.tool_memo.clear()
+    
+    def load_history(self, messages: List[Dict]):
+        """
+        Rebuild conversation memory from stored chat messages.
+        
+        Args:
+            messages: Oldest-first list of dicts with role and content
+        """
+        for message in messages:
+            if message["role"] == "user":
+                self.memory.chat_memory.add_user_message(message["content"])
+            else:
+                self.memory.chat_memory.add_ai_message(message["content"])
+        
+        # Fold whatever does not fit the window into the summary
+        if isinstance(self.memory, RollingSummaryMemory):
+            self.memory.prune()
+    
+    def memory_size(self) -> int:
+        """Approximate bytes held by the conversation memory and tool memo."""
+        size = sum(sys.getsizeof(message.content) for message in self.memory.chat_memory.messages)
+        size += sys.getsizeof(getattr(self.memory, "moving_summary_buffer", ""))
+        return size + self.tool_memo.size()
+
+
+class StreamingEventHandler(BaseCallbackHandler):
+    """
+    Collects agent run events for streaming to a client.
+    
+    Must be created on the event loop that consumes it. Callbacks push
+    (event, data) pairs onto an asyncio queue on that loop, also when they
+    fire in worker threads; events() yields them until finish() is called.
+    """
+    
+    run_inline = True  # Call from the agent's task rather than an executor thread
+    _DONE = object()
+    
+    def __init__(self):
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue = asyncio.Queue()
+    
+    def _put(self, item: Any):
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, item)
+    
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        if token:
+            self._put(("token", {"token": token}))
+    
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, **kwargs: Any) -> None:
+        self._put(("tool_start", {
+            "tool": (serialized or {}).get("name"),
+            "input": input_str
+        }))
+    
+    def on_tool_end(self, output: Any, **kwargs: Any) -> None:
+        self._put(("tool_end", {"output": str(output)[:500]}))  # Limit length
+    
+    def emit(self, event: str, data: Dict):
+        """Push a custom event, e.g. the final answer."""
+        self._put((event, data))
+    
+    def finish(self):
+        """Signal that no more events will follow."""
+        self._put(self._DONE)
+    
+    async def events(self) -> AsyncIterator[Tuple[str, Dict]]:
+        """Yield events until finish() is called."""
+        while True:
+            item = await self._queue.get()
+            if item is self._DONE:
+                return
+            yield item
 
 
-def create_agent(db: Session, job_id: Optional[int] = None) -> HRAgent:
-    """Factory function to create an HR agent."""
-    return HRAgent(db=db, job_id=job_id)
+def create_agent(job_id: Optional[int] = None) -> HRAgent:
+    """Factory function to create an HR agent session."""
+    return HRAgent(job_id=job_id)
 
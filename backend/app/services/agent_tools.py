@@ -1,331 +1,479 @@
-from langchain.tools import tool
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from langchain.tools import StructuredTool
+from sqlalchemy.orm import sessionmaker, selectinload
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import functools
 import json
-from app.services.retrieval import retrieval_service
-from app.services.generation import evaluate_candidate
-from app.services.rag_service import RAGService
+from app.config import settings
+from app.services.retrieval import retrieval_service, has_legacy_vectors
+from app.services.rag_service import RAGService, EVALUATION_FIELDS
+from app.services.db_service import session_scope
+from app.services import generation, skill_index
+from app.services.tool_memo import current_tool_memo
 from app.models.database import Job, Candidate, Evaluation
 
 
-@tool
-def search_candidates(job_id: int, query: str = None, top_k: int = 15) -> str:
-    """Search for candidates using vector similarity search.
-    
-    Use this tool to find candidates that match a job description.
-    
-    Args:
-        job_id: The job ID to search candidates for (required)
-        query: Optional search query. If not provided, uses the job description
-        top_k: Number of top candidates to retrieve (default: 15, max: 50)
-    
-    Returns:
-        JSON string with candidate IDs, names, and similarity scores
-    """
-    try:
-        # Limit top_k to prevent abuse
-        top_k = min(top_k, 50)
-        
-        # Get job description
-        # Note: In real implementation, we'd pass db session
-        # For now, we'll use the retrieval service which already has job context
-        
-        # Use retrieval service to find candidates
-        if query:
-            matches = retrieval_service.retrieve_top_k(query, top_k=top_k)
-        else:
-            # Default to job description - this would need job from DB
-            matches = retrieval_service.retrieve_top_k("", top_k=top_k)
-        
-        result = {
-            "candidates": [
-                {
-                    "candidate_id": match.get("candidate_id"),
-                    "score": match.get("score", 0),
-                    "metadata": match.get("metadata", {})
-                }
-                for match in matches
-            ],
-            "count": len(matches)
-        }
-        
-        return json.dumps(result, indent=2)
-    except Exception as e:
-        return json.dumps({"error": f"Error searching candidates: {str(e)}"})
+# Shortest a string field is cut to before lists are shortened
+_MIN_TRUNCATED_CHARS = 200
+
+
+def _dump(payload: Any) -> str:
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False, default=str)
 
 
-@tool
-def evaluate_candidate(candidate_id: int, job_id: int, focus_areas: Optional[List[str]] = None) -> str:
-    """Perform detailed evaluation of a candidate against a job.
+def _observation(payload: Dict, max_tokens: Optional[int] = None) -> str:
+    """
+    Encode a tool result for the agent scratchpad.
     
-    Use this tool to get comprehensive evaluation scores and analysis for a candidate.
+    Results are compact JSON capped at max_tokens (estimated at ~4
+    characters per token). Over the cap, the longest strings are cut
+    first, down to _MIN_TRUNCATED_CHARS each, and only then are the
+    longest lists shortened from the end, recording how many items were
+    omitted.
+    """
+    max_chars = (max_tokens or settings.tool_observation_max_tokens) * 4
+    encoded = _dump(payload)
+    if len(encoded) <= max_chars:
+        return encoded
     
-    Args:
-        candidate_id: ID of the candidate to evaluate (required)
-        job_id: Job ID for evaluation context (required)
-        focus_areas: Optional list of areas to focus on, e.g., ['technical', 'experience', 'education']
+    payload = dict(payload)
+    string_keys = [key for key, value in payload.items() if isinstance(value, str)]
+    for key in sorted(string_keys, key=lambda k: len(payload[k]), reverse=True):
+        overflow = len(encoded) - max_chars
+        value = payload[key]
+        keep = max(len(value) - overflow - 16, _MIN_TRUNCATED_CHARS)
+        if keep >= len(value):
+            continue
+        payload[key] = value[:keep] + "...[truncated]"
+        encoded = _dump(payload)
+        if len(encoded) <= max_chars:
+            return encoded
     
-    Returns:
-        JSON string with detailed evaluation scores, strengths, concerns, and recommendation
-    """
-    try:
-        # This would need db session - simplified for now
-        # In actual implementation, we'd get job and candidate from DB
-        # For now, using the generation service directly
-        
-        # Get job and candidate from database (would need db session)
-        # job = db.query(Job).filter(Job.id == job_id).first()
-        # candidate = db.query(Candidate).filter(Candidate.id == candidate_id).first()
-        
-        # For tool interface, we'll return a message indicating this needs DB context
-        # In full implementation, this would be:
-        # evaluation = evaluate_candidate(job.description, candidate.resume_text)
-        
-        result = {
-            "candidate_id": candidate_id,
-            "job_id": job_id,
-            "message": "Evaluation requires database session. Use RAGService for full evaluation.",
-            "note": "This tool will evaluate the candidate when called with proper DB context"
-        }
-        
-        return json.dumps(result, indent=2)
-    except Exception as e:
-        return json.dumps({"error": f"Error evaluating candidate: {str(e)}"})
+    list_keys = [key for key, value in payload.items() if isinstance(value, list)]
+    for key in sorted(list_keys, key=lambda k: len(_dump(payload[k])), reverse=True):
+        items = list(payload[key])
+        omitted = 0
+        while items and len(encoded) > max_chars:
+            items.pop()
+            omitted += 1
+            encoded = _dump({**payload, key: items, f"{key}_omitted": omitted})
+        payload[key] = items
+        if omitted:
+            payload[f"{key}_omitted"] = omitted
+        if len(encoded) <= max_chars:
+            return encoded
+    
+    return encoded[:max_chars]
 
 
-@tool
-def compare_candidates(candidate_ids: List[int], job_id: int) -> str:
-    """Compare multiple candidates side by side.
-    
-    Use this tool to see how candidates stack up against each other.
-    
-    Args:
-        candidate_ids: List of candidate IDs to compare (2-10 candidates)
-        job_id: Job ID for comparison context
+def _memoized(func: Callable) -> Callable:
+    """
+    Serve repeated calls from the running session's tool memo.
     
-    Returns:
-        JSON string with side-by-side comparison of scores and key metrics
+    Error results are not cached, so a failed lookup can be retried.
     """
-    try:
-        # Limit comparison count
-        candidate_ids = candidate_ids[:10]
-        
-        if len(candidate_ids) < 2:
-            return json.dumps({"error": "Need at least 2 candidates to compare"})
-        
-        # This would fetch evaluations from DB and compare
-        # Simplified for tool interface
-        
-        result = {
-            "job_id": job_id,
-            "candidate_ids": candidate_ids,
-            "message": "Comparison requires database session. Use RAGService for full comparison.",
-            "comparison": "This will show side-by-side scores, strengths, and weaknesses when fully implemented"
-        }
+    @functools.wraps(func)
+    def wrapper(**kwargs):
+        memo = current_tool_memo.get()
+        if memo is None:
+            return func(**kwargs)
         
-        return json.dumps(result, indent=2)
-    except Exception as e:
-        return json.dumps({"error": f"Error comparing candidates: {str(e)}"})
+        cached = memo.get(func.__name__, kwargs)
+        if cached is not None:
+            return cached
+        result = func(**kwargs)
+        if not result.startswith('{"error"'):
+            memo.put(func.__name__, kwargs, result)
+        return result
+    
+    return wrapper
 
 
-@tool
-def get_job_details(job_id: int) -> str:
-    """Get detailed information about a job posting.
+def _as_tool(func: Callable) -> StructuredTool:
+    """
+    Build a tool from a blocking function that also supports async agent runs.
     
-    Use this tool to retrieve job title, description, and requirements.
+    Async runs execute the function in a worker thread, keeping database
+    and network calls off the event loop. Results are memoized per session.
+    """
+    func = _memoized(func)
     
-    Args:
-        job_id: The job ID to get details for
+    async def coroutine(**kwargs):
+        return await asyncio.to_thread(func, **kwargs)
     
-    Returns:
-        JSON string with job title, description, requirements, and metadata
-    """
-    try:
-        # This would query the database
-        # For now, return a template response
-        
-        result = {
-            "job_id": job_id,
-            "message": "Job details require database session. Use DB query in full implementation.",
-            "fields": ["title", "description", "requirements", "created_at"]
-        }
-        
-        return json.dumps(result, indent=2)
-    except Exception as e:
-        return json.dumps({"error": f"Error getting job details: {str(e)}"})
+    return StructuredTool.from_function(func=func, coroutine=coroutine)
 
 
-@tool
-def filter_candidates(
-    job_id: int,
-    min_score: Optional[float] = None,
-    skills: Optional[List[str]] = None,
-    min_experience: Optional[int] = None
-) -> str:
-    """Filter candidates based on criteria.
-    
-    Use this tool to narrow down candidates by score, skills, or experience.
+def create_agent_tools(session_factory: sessionmaker):
+    """
+    Create the agent's database-backed tools.
     
-    Args:
-        job_id: Job ID to filter candidates for
-        min_score: Minimum overall score (0-100)
-        skills: List of required skills
-        min_experience: Minimum years of experience
+    The tools are shared by every chat session, so instead of closing over
+    a request's Session each call checks out its own from session_factory
+    and returns the connection to the pool as soon as it is done.
     
-    Returns:
-        JSON string with filtered candidate list
+    Results carry only the fields needed to reason about the next step.
+    Long content (job descriptions, resumes, evaluation write-ups) is left
+    out or cut short and can be fetched with expand_ref.
     """
-    try:
-        result = {
-            "job_id": job_id,
-            "filters": {
-                "min_score": min_score,
-                "skills": skills,
-                "min_experience": min_experience
-            },
-            "message": "Filtering requires database session and evaluation data."
-        }
-        
-        return json.dumps(result, indent=2)
-    except Exception as e:
-        return json.dumps({"error": f"Error filtering candidates: {str(e)}"})
-
-
-# Helper function to create tools with DB session
-def create_tools_with_db(db: Session):
-    """Create tools with database session context."""
     
-    @tool
+    @_as_tool
     def search_candidates_db(job_id: int, query: str = None, top_k: int = 15) -> str:
-        """Search candidates with DB context."""
-        job = db.query(Job).filter(Job.id == job_id).first()
-        if not job:
-            return json.dumps({"error": f"Job {job_id} not found"})
+        """Search a job's candidates by semantic similarity to the job description or a query.
+        
+        Returns candidate IDs, names and similarity scores. Use
+        expand_ref("candidate:<id>") to read a resume.
+        
+        Args:
+            job_id: The job ID to search candidates for
+            query: Optional search query. If not provided, uses the job description
+            top_k: Number of candidates to retrieve (default: 15, max: 50)
+        """
+        with session_scope(session_factory) as db:
+            job = db.query(Job).filter(Job.id == job_id).first()
+            if not job:
+                return _observation({"error": f"Job {job_id} not found"})
+            search_query = query if query else job.description
+            include_legacy = has_legacy_vectors(db, job_id)
+        
+        # No connection is held during the embedding and vector store calls
+        matches = retrieval_service.retrieve_top_k(
+            search_query, top_k=min(top_k, 50), job_id=job_id, include_legacy=include_legacy
+        )
         
-        search_query = query if query else job.description
-        matches = retrieval_service.retrieve_top_k(search_query, top_k=min(top_k, 50))
+        candidate_ids = [match.get("candidate_id") for match in matches]
+        with session_scope(session_factory) as db:
+            names = dict(db.query(Candidate.id, Candidate.name).filter(
+                Candidate.id.in_(candidate_ids)
+            ).all())
         
         result = {
             "job_id": job_id,
-            "job_title": job.title,
+            "count": len(matches),
             "candidates": [
                 {
-                    "candidate_id": match.get("candidate_id"),
-                    "score": round(match.get("score", 0), 3),
-                    "metadata": match.get("metadata", {})
+                    "id": match.get("candidate_id"),
+                    "name": names.get(match.get("candidate_id")) or "Unknown",
+                    "score": round(match.get("score", 0), 3)
                 }
                 for match in matches
-            ],
-            "count": len(matches)
+            ]
         }
-        return json.dumps(result, indent=2)
+        return _observation(result)
     
-    @tool
+    @_as_tool
     def get_job_details_db(job_id: int) -> str:
-        """Get job details with DB context."""
-        job = db.query(Job).filter(Job.id == job_id).first()
-        if not job:
-            return json.dumps({"error": f"Job {job_id} not found"})
+        """Get a job's title and description.
         
-        result = {
-            "job_id": job.id,
-            "title": job.title,
-            "description": job.description,
-            "created_at": job.created_at.isoformat() if job.created_at else None
-        }
-        return json.dumps(result, indent=2)
+        Long descriptions are shortened; use expand_ref("job:<id>") for the full text.
+        
+        Args:
+            job_id: The job ID to get details for
+        """
+        with session_scope(session_factory) as db:
+            job = db.query(Job).filter(Job.id == job_id).first()
+            if not job:
+                return _observation({"error": f"Job {job_id} not found"})
+            
+            result = {
+                "job_id": job.id,
+                "title": job.title,
+                "ref": f"job:{job.id}",
+                "description": job.description
+            }
+            return _observation(result)
     
-    @tool
+    @_as_tool
     def evaluate_candidate_db(candidate_id: int, job_id: int) -> str:
-        """Evaluate candidate with DB context."""
-        job = db.query(Job).filter(Job.id == job_id).first()
-        candidate = db.query(Candidate).filter(Candidate.id == candidate_id).first()
+        """Evaluate a candidate against a job with GPT-4, returning scores, strengths, concerns and a recommendation.
+        
+        A stored evaluation is returned when it is still up to date. Use
+        expand_ref("evaluation:<candidate_id>") for the full written analysis.
         
-        if not job:
-            return json.dumps({"error": f"Job {job_id} not found"})
-        if not candidate:
-            return json.dumps({"error": f"Candidate {candidate_id} not found"})
+        Args:
+            candidate_id: ID of the candidate to evaluate
+            job_id: Job ID for evaluation context
+        """
+        with session_scope(session_factory) as db:
+            job = db.query(Job).filter(Job.id == job_id).first()
+            candidate = db.query(Candidate).options(
+                selectinload(Candidate.resume)
+            ).filter(Candidate.id == candidate_id).first()
+            
+            if not job:
+                return _observation({"error": f"Job {job_id} not found"})
+            if not candidate:
+                return _observation({"error": f"Candidate {candidate_id} not found"})
+            
+            job_description = job.description
+            resume_text = candidate.resume_text or ""
+            name = candidate.name
+            same_job = candidate.job_id == job_id
+            rag = RAGService(db, session_factory=session_factory)
+            if same_job:
+                # Read through the evaluations table
+                results, stale = rag.find_fresh_evaluations(job_description, {candidate_id: resume_text})
         
-        evaluation_data = evaluate_candidate(job.description, candidate.resume_text)
+        # The scope is closed: no connection is held during the GPT-4 call
+        if same_job:
+            # New results are saved in a short session of their own
+            if stale:
+                results.update(rag.evaluate_and_save(job_description, {candidate_id: resume_text}, stale))
+            evaluation_data = results.get(candidate_id)
+            if evaluation_data is None:
+                return _observation({"error": f"Could not evaluate candidate {candidate_id}"})
+        else:
+            # Stored evaluations are against the candidate's own job
+            evaluation_data = generation.evaluate_candidate(job_description, resume_text)
         
         result = {
             "candidate_id": candidate_id,
-            "candidate_name": candidate.name or "Unknown",
+            "name": name or "Unknown",
             "job_id": job_id,
-            "job_title": job.title,
-            **evaluation_data
+            **{key: evaluation_data[key] for key in EVALUATION_FIELDS if key != "ai_analysis"}
         }
-        return json.dumps(result, indent=2)
+        return _observation(result)
     
-    @tool
+    @_as_tool
     def compare_candidates_db(candidate_ids: List[int], job_id: int) -> str:
-        """Compare multiple candidates side by side with DB context."""
+        """Compare 2-10 candidates for a job side by side, ranked by overall score.
+        
+        Args:
+            candidate_ids: List of candidate IDs to compare (2-10 candidates)
+            job_id: Job ID for comparison context
+        """
         if len(candidate_ids) < 2:
-            return json.dumps({"error": "Need at least 2 candidates to compare"})
+            return _observation({"error": "Need at least 2 candidates to compare"})
         
         if len(candidate_ids) > 10:
             candidate_ids = candidate_ids[:10]
         
-        job = db.query(Job).filter(Job.id == job_id).first()
-        if not job:
-            return json.dumps({"error": f"Job {job_id} not found"})
-        
-        candidates = db.query(Candidate).filter(
-            Candidate.id.in_(candidate_ids),
-            Candidate.job_id == job_id
-        ).all()
-        
-        if len(candidates) < 2:
-            return json.dumps({"error": "Not enough candidates found for comparison"})
-        
-        # Get or create evaluations
-        comparisons = []
-        for candidate in candidates:
-            # Check if evaluation exists
-            evaluation = db.query(Evaluation).filter(
-                Evaluation.candidate_id == candidate.id
-            ).first()
+        with session_scope(session_factory) as db:
+            job = db.query(Job).filter(Job.id == job_id).first()
+            if not job:
+                return _observation({"error": f"Job {job_id} not found"})
+            
+            candidates = db.query(Candidate).options(
+                selectinload(Candidate.resume)
+            ).filter(
+                Candidate.id.in_(candidate_ids),
+                Candidate.job_id == job_id
+            ).all()
             
-            if not evaluation:
-                # Create evaluation
-                eval_data = evaluate_candidate(job.description, candidate.resume_text)
-                evaluation = Evaluation(
-                    candidate_id=candidate.id,
-                    overall_score=eval_data["overall_score"],
-                    technical_score=eval_data["technical_score"],
-                    experience_score=eval_data["experience_score"],
-                    education_score=eval_data["education_score"],
-                    strengths=eval_data["strengths"],
-                    concerns=eval_data["concerns"],
-                    recommendation=eval_data["recommendation"],
-                    ai_analysis=eval_data.get("ai_analysis", "")
-                )
-                db.add(evaluation)
-                db.commit()
+            if len(candidates) < 2:
+                return _observation({"error": "Not enough candidates found for comparison"})
             
-            comparisons.append({
-                "candidate_id": candidate.id,
-                "candidate_name": candidate.name or "Unknown",
-                "overall_score": evaluation.overall_score,
-                "technical_score": evaluation.technical_score,
-                "experience_score": evaluation.experience_score,
-                "education_score": evaluation.education_score,
-                "recommendation": evaluation.recommendation,
-                "strengths": evaluation.strengths or [],
-                "concerns": evaluation.concerns or []
-            })
+            job_description = job.description
+            names = {candidate.id: candidate.name for candidate in candidates}
+            resumes = {candidate.id: candidate.resume_text or "" for candidate in candidates}
+            
+            # One query for stored evaluations
+            rag = RAGService(db, session_factory=session_factory)
+            results, stale = rag.find_fresh_evaluations(job_description, resumes)
+        
+        # The scope is closed: missing or outdated evaluations run concurrently
+        # with no connection held and are saved in one short transaction
+        results.update(rag.evaluate_and_save(
+            job_description,
+            {candidate_id: resumes[candidate_id] for candidate_id in stale},
+            stale
+        ))
+        
+        comparisons = [
+            {
+                "id": candidate_id,
+                "name": name or "Unknown",
+                "overall": round(results[candidate_id]["overall_score"], 1),
+                "technical": round(results[candidate_id]["technical_score"], 1),
+                "experience": round(results[candidate_id]["experience_score"], 1),
+                "education": round(results[candidate_id]["education_score"], 1),
+                "recommendation": results[candidate_id]["recommendation"],
+                "strengths": (results[candidate_id]["strengths"] or [])[:3],
+                "concerns": (results[candidate_id]["concerns"] or [])[:3]
+            }
+            for candidate_id, name in names.items()
+            if candidate_id in results
+        ]
+        failed = [candidate_id for candidate_id in names if candidate_id not in results]
         
         # Sort by overall score
-        comparisons.sort(key=lambda x: x["overall_score"], reverse=True)
+        comparisons.sort(key=lambda x: x["overall"], reverse=True)
         
         result = {
             "job_id": job_id,
-            "job_title": job.title,
-            "comparisons": comparisons,
-            "summary": f"Compared {len(comparisons)} candidates. Top ranked: {comparisons[0]['candidate_name']} (Score: {comparisons[0]['overall_score']:.1f})"
+            "comparisons": comparisons
         }
+        if failed:
+            result["failed"] = failed
         
-        return json.dumps(result, indent=2)
+        return _observation(result)
     
-    return [search_candidates_db, get_job_details_db, evaluate_candidate_db, compare_candidates_db]
-
+    @_as_tool
+    def screen_job_db(job_id: int, top_k: int = 15, top_n: int = 5) -> str:
+        """Screen a job in one step: retrieve matching candidates, evaluate them concurrently and return a ranked shortlist.
+        
+        Prefer this over chaining get_job_details_db, search_candidates_db and
+        evaluate_candidate_db when asked for the best candidates for a job.
+        Evaluations that are already up to date are reused.
+        
+        Args:
+            job_id: The job ID to screen candidates for
+            top_k: Number of candidates to retrieve and evaluate (default: 15, max: 50)
+            top_n: Number of ranked candidates to return (default: 5, max: 10)
+        """
+        with session_scope(session_factory) as db:
+            job = db.query(Job).filter(Job.id == job_id).first()
+            if not job:
+                return _observation({"error": f"Job {job_id} not found"})
+            job_title = job.title
+            job_description = job.description
+            include_legacy = has_legacy_vectors(db, job_id)
+        
+        # No connection is held during the embedding and vector store calls
+        matches = retrieval_service.retrieve_top_k(
+            job_description, top_k=min(top_k, 50), job_id=job_id, include_legacy=include_legacy
+        )
+        candidate_ids = [match["candidate_id"] for match in matches if match.get("candidate_id")]
+        
+        with session_scope(session_factory) as db:
+            candidates = db.query(Candidate).options(
+                selectinload(Candidate.resume)
+            ).filter(
+                Candidate.id.in_(candidate_ids),
+                Candidate.job_id == job_id
+            ).all()
+            names = {candidate.id: candidate.name for candidate in candidates}
+            resumes = {candidate.id: candidate.resume_text or "" for candidate in candidates}
+            
+            rag = RAGService(db, session_factory=session_factory)
+            results, stale = rag.find_fresh_evaluations(job_description, resumes)
+        
+        # The scope is closed: evaluations run with no connection held and
+        # are saved in one short transaction
+        results.update(rag.evaluate_and_save(
+            job_description,
+            {candidate_id: resumes[candidate_id] for candidate_id in stale},
+            stale
+        ))
+        
+        ranked = sorted(
+            (candidate_id for candidate_id in names if candidate_id in results),
+            key=lambda candidate_id: results[candidate_id]["overall_score"],
+            reverse=True
+        )[:min(top_n, 10)]
+        failed = [candidate_id for candidate_id in names if candidate_id not in results]
+        
+        result = {
+            "job_id": job_id,
+            "job_title": job_title,
+            "candidates_considered": len(names),
+            "evaluated": len(names) - len(failed),
+            "failed": len(failed),
+            "ranked": [
+                {
+                    "id": candidate_id,
+                    "name": names[candidate_id] or "Unknown",
+                    "overall": round(results[candidate_id]["overall_score"], 1),
+                    "technical": round(results[candidate_id]["technical_score"], 1),
+                    "experience": round(results[candidate_id]["experience_score"], 1),
+                    "education": round(results[candidate_id]["education_score"], 1),
+                    "recommendation": results[candidate_id]["recommendation"],
+                    "strengths": (results[candidate_id]["strengths"] or [])[:2],
+                    "concerns": (results[candidate_id]["concerns"] or [])[:2]
+                }
+                for candidate_id in ranked
+            ]
+        }
+        return _observation(result)
+    
+    @_as_tool
+    def filter_candidates_db(
+        job_id: int,
+        skills: Optional[List[str]] = None,
+        min_score: Optional[float] = None,
+        limit: int = 20
+    ) -> str:
+        """Filter a job's candidates by required skills and/or minimum overall evaluation score, e.g. "who knows Kubernetes and Go?". Answered from the skill index without any LLM call.
+        
+        Args:
+            job_id: Job ID to filter candidates for
+            skills: Skills the candidate must all have, e.g. ["kubernetes", "go"]
+            min_score: Minimum overall score (0-100); only evaluated candidates match
+            limit: Maximum number of candidates to return (default: 20, max: 50)
+        """
+        with session_scope(session_factory) as db:
+            required, matches = skill_index.filter_candidates(
+                db,
+                job_id,
+                skills=skills,
+                min_score=min_score,
+                limit=min(limit, 50)
+            )
+        
+        result = {
+            "job_id": job_id,
+            "skills": required,
+            "count": len(matches),
+            "candidates": [
+                {
+                    "id": match["candidate_id"],
+                    "name": match["name"] or "Unknown",
+                    "overall": round(match["overall_score"], 1) if match["overall_score"] is not None else None,
+                    "skills": match["skills"]
+                }
+                for match in matches
+            ]
+        }
+        return _observation(result)
+    
+    @_as_tool
+    def expand_ref(ref: str) -> str:
+        """Fetch the full content behind a reference: "job:<id>" (full description), "candidate:<id>" (resume text) or "evaluation:<candidate_id>" (complete evaluation with written analysis).
+        
+        Args:
+            ref: Reference of the form kind:id
+        """
+        kind, _, raw_id = ref.strip().partition(":")
+        if not raw_id.strip().isdigit():
+            return _observation({"error": f"Invalid reference: {ref}"})
+        ref_id = int(raw_id)
+        
+        with session_scope(session_factory) as db:
+            if kind == "job":
+                job = db.get(Job, ref_id)
+                if not job:
+                    return _observation({"error": f"Job {ref_id} not found"})
+                result = {"job_id": job.id, "title": job.title, "description": job.description}
+            elif kind == "candidate":
+                candidate = db.get(Candidate, ref_id)
+                if not candidate:
+                    return _observation({"error": f"Candidate {ref_id} not found"})
+                result = {
+                    "candidate_id": candidate.id,
+                    "name": candidate.name or "Unknown",
+                    "email": candidate.email,
+                    "job_id": candidate.job_id,
+                    "resume_text": candidate.resume_text
+                }
+            elif kind == "evaluation":
+                evaluation = db.query(Evaluation).filter(Evaluation.candidate_id == ref_id).first()
+                if not evaluation:
+                    return _observation({"error": f"No evaluation for candidate {ref_id}"})
+                result = {
+                    "candidate_id": ref_id,
+                    **{field: getattr(evaluation, field) for field in EVALUATION_FIELDS}
+                }
+            else:
+                return _observation({"error": f"Unknown reference kind: {kind}"})
+        
+        return _observation(result, max_tokens=settings.tool_expand_max_tokens)
+    
+    return [
+        screen_job_db,
+        search_candidates_db,
+        get_job_details_db,
+        evaluate_candidate_db,
+        compare_candidates_db,
+        filter_candidates_db,
+        expand_ref
+    ]
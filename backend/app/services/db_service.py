@@ -1,17 +1,83 @@
-from sqlalchemy import create_engine
+from contextlib import contextmanager
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
+from typing import AsyncIterator, Iterator
 from app.config import settings
 from app.models.database import Base
 
 # Create database engine
-engine = create_engine(settings.database_url)
+engine = create_engine(
+    settings.database_url,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=settings.db_pool_pre_ping
+)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async drivers for the URL schemes database_url may use
+_ASYNC_DRIVERS = {
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_database_url() -> str:
+    """The async_database_url setting, or database_url with its async driver."""
+    if settings.async_database_url:
+        return settings.async_database_url
+    scheme, separator, rest = settings.database_url.partition("://")
+    return f"{_ASYNC_DRIVERS.get(scheme, scheme)}{separator}{rest}"
+
+
+# Async engine used by the API routes, so waiting on the database does not
+# block the event loop. Agent tools and background runs, which execute in
+# threads, keep the sync engine above.
+async_engine = create_async_engine(
+    get_async_database_url(),
+    poolclass=AsyncAdaptedQueuePool,  # Pooled whatever the dialect's default
+    pool_size=settings.db_async_pool_size,
+    max_overflow=settings.db_async_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_async_pool_recycle,
+    pool_pre_ping=settings.db_pool_pre_ping
+)
+
+# Objects stay usable after commit; lazy loads are not possible with AsyncSession
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 
 def init_db():
-    """Initialize database tables."""
+    """
+    Initialize database tables.
+    
+    Databases managed with Alembic are left to the migrations, so that
+    create_all never adds tables a later migration would try to create.
+    A database holding only some of the tables predates the migrations;
+    create_all could not add its missing columns and would break the
+    upgrade, so it is refused until the database is stamped.
+    """
+    inspector = inspect(engine)
+    if inspector.has_table("alembic_version"):
+        return
+    
+    existing = set(inspector.get_table_names())
+    missing = [name for name in Base.metadata.tables if name not in existing]
+    if missing and len(missing) < len(Base.metadata.tables):
+        message = (
+            "Database schema predates migrations (missing tables: "
+            f"{', '.join(missing)}). Upgrade it before starting the app: "
+            "alembic stamp 0001_initial_schema && alembic upgrade head"
+        )
+        print(message)
+        raise RuntimeError(message)
     Base.metadata.create_all(bind=engine)
 
 
@@ -23,3 +89,26 @@ def get_db() -> Session:
     finally:
         db.close()
 
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Dependency to get an async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+@contextmanager
+def session_scope(session_factory: sessionmaker = SessionLocal) -> Iterator[Session]:
+    """
+    Short-lived session for work outside a request, such as an agent tool call.
+    
+    The connection is returned to the pool as soon as the block exits,
+    rolling back anything left uncommitted.
+    """
+    db = session_factory()
+    try:
+        yield db
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -1,10 +1,27 @@
 from openai import OpenAI
 from app.config import settings
+from app.services.embedding_cache import embedding_cache
 from typing import List
 import os
 
 client = OpenAI(api_key=settings.openai_api_key)
 
+# Safe limit for text-embedding-3-small
+MAX_EMBEDDING_CHARS = 8000
+
+
+def _prepare_text(text: str) -> str:
+    """Normalize whitespace and truncate text to the embedding input limit."""
+    text = " ".join(text.split())
+    if len(text) > MAX_EMBEDDING_CHARS:
+        return text[:MAX_EMBEDDING_CHARS]
+    return text
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token for English text)."""
+    return len(text) // 4 + 1
+
 
 def get_embedding(text: str, model: str = "text-embedding-3-small") -> List[float]:
     """
@@ -19,16 +36,97 @@ def get_embedding(text: str, model: str = "text-embedding-3-small") -> List[floa
     """
     try:
         # Truncate text if too long (max tokens for embedding)
-        max_chars = 8000  # Safe limit for text-embedding-3-small
-        if len(text) > max_chars:
-            text = text[:max_chars]
+        text = _prepare_text(text)
+        
+        cached = embedding_cache.get_many(model, [text])
+        if cached:
+            return cached[0]
         
         response = client.embeddings.create(
             model=model,
             input=text
         )
         
-        return response.data[0].embedding
+        embedding = response.data[0].embedding
+        embedding_cache.put_many(model, [text], [embedding])
+        return embedding
     except Exception as e:
         raise Exception(f"Error generating embedding: {str(e)}")
 
+
+def _pack_batches(texts: List[str]) -> List[List[int]]:
+    """Group text indexes into batches that fit the per-request budget."""
+    batches = []
+    current = []
+    current_tokens = 0
+    
+    for i, text in enumerate(texts):
+        tokens = _estimate_tokens(text)
+        if current and (
+            current_tokens + tokens > settings.embedding_batch_max_tokens
+            or len(current) >= settings.embedding_batch_max_inputs
+        ):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(i)
+        current_tokens += tokens
+    
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _embed_batch(texts: List[str], model: str) -> List[List[float]]:
+    """Embed one batch, splitting it in half and retrying on failure."""
+    try:
+        response = client.embeddings.create(
+            model=model,
+            input=texts
+        )
+        # The API tags each result with its input position
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+    except Exception:
+        if len(texts) == 1:
+            raise
+        mid = len(texts) // 2
+        return _embed_batch(texts[:mid], model) + _embed_batch(texts[mid:], model)
+
+
+def get_embeddings(texts: List[str], model: str = "text-embedding-3-small") -> List[List[float]]:
+    """
+    Generate embeddings for many texts with as few API calls as possible.
+    
+    Args:
+        texts: Input texts to embed
+        model: Embedding model to use (default: text-embedding-3-small)
+    
+    Returns:
+        List of embedding vectors, in the same order as texts
+    """
+    try:
+        prepared = [_prepare_text(text) for text in texts]
+        embeddings = [None] * len(prepared)
+        
+        # Only texts that were never embedded before go to the API
+        for i, embedding in embedding_cache.get_many(model, prepared).items():
+            embeddings[i] = embedding
+        
+        # Embed each distinct missing text once
+        pending = {}
+        for i, text in enumerate(prepared):
+            if embeddings[i] is None:
+                pending.setdefault(text, []).append(i)
+        missing = list(pending)
+        
+        for batch in _pack_batches(missing):
+            batch_texts = [missing[i] for i in batch]
+            batch_embeddings = _embed_batch(batch_texts, model)
+            embedding_cache.put_many(model, batch_texts, batch_embeddings)
+            for text, embedding in zip(batch_texts, batch_embeddings):
+                for i in pending[text]:
+                    embeddings[i] = embedding
+        
+        return embeddings
+    except Exception as e:
+        raise Exception(f"Error generating embeddings: {str(e)}")
@@ -0,0 +1,148 @@
+from collections import OrderedDict
+from sqlalchemy.dialects.postgresql import insert
+from typing import Dict, List
+import hashlib
+import threading
+import numpy as np
+from app.config import settings
+from app.models.database import EmbeddingCacheEntry
+from app.services.db_service import SessionLocal
+from app.services.metrics import metrics
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 of text, used as the cache key alongside the model name."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-tier, content-addressed embedding cache.
+
+    Entries are keyed by (model, hash of normalized text). Lookups go to an
+    in-process LRU first, then to the embedding_cache table, so the same
+    resume or job description is only sent to the embeddings API once.
+    """
+
+    def __init__(self, max_size: int, persist: bool = True):
+        self.max_size = max_size
+        self.persist = persist
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (model, hash) -> float32 array
+
+    def get_many(self, model: str, texts: List[str]) -> Dict[int, List[float]]:
+        """
+        Look up cached embeddings.
+
+        Args:
+            model: Embedding model name
+            texts: Normalized texts
+
+        Returns:
+            Dictionary mapping input index to embedding, for cache hits only
+        """
+        hashes = [content_hash(text) for text in texts]
+        found = {}
+        missing = {}
+
+        with self._lock:
+            for i, key_hash in enumerate(hashes):
+                vector = self._entries.get((model, key_hash))
+                if vector is not None:
+                    self._entries.move_to_end((model, key_hash))
+                    found[i] = vector
+                else:
+                    missing.setdefault(key_hash, []).append(i)
+        metrics.increment("embedding_cache.memory_hits", len(found))
+
+        if missing and self.persist:
+            db_hits = 0
+            for key_hash, vector in self._load(model, list(missing)).items():
+                self._remember(model, key_hash, vector)
+                for i in missing.pop(key_hash):
+                    found[i] = vector
+                    db_hits += 1
+            metrics.increment("embedding_cache.db_hits", db_hits)
+
+        metrics.increment("embedding_cache.misses", sum(len(indexes) for indexes in missing.values()))
+        return {i: vector.tolist() for i, vector in found.items()}
+
+    def put_many(self, model: str, texts: List[str], embeddings: List[List[float]]):
+        """Store freshly generated embeddings in both tiers."""
+        entries = {}
+        for text, embedding in zip(texts, embeddings):
+            key_hash = content_hash(text)
+            vector = np.asarray(embedding, dtype=np.float32)
+            self._remember(model, key_hash, vector)
+            entries[key_hash] = vector
+
+        if entries and self.persist:
+            self._store(model, entries)
+
+    def clear(self):
+        """Drop the in-process tier."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Cache size and hit/miss counters."""
+        counters = metrics.snapshot()["counters"]
+        with self._lock:
+            size = len(self._entries)
+        return {
+            "size": size,
+            "max_size": self.max_size,
+            "memory_hits": counters.get("embedding_cache.memory_hits", 0),
+            "db_hits": counters.get("embedding_cache.db_hits", 0),
+            "misses": counters.get("embedding_cache.misses", 0)
+        }
+
+    def _remember(self, model: str, key_hash: str, vector: np.ndarray):
+        with self._lock:
+            self._entries[(model, key_hash)] = vector
+            self._entries.move_to_end((model, key_hash))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _load(self, model: str, hashes: List[str]) -> Dict[str, np.ndarray]:
+        db = SessionLocal()
+        try:
+            rows = db.query(EmbeddingCacheEntry).filter(
+                EmbeddingCacheEntry.model == model,
+                EmbeddingCacheEntry.content_hash.in_(hashes)
+            ).all()
+            return {
+                row.content_hash: np.frombuffer(row.embedding, dtype=np.float32)
+                for row in rows
+            }
+        except Exception as e:
+            print(f"Warning: Could not read embedding cache: {e}")
+            return {}
+        finally:
+            db.close()
+
+    def _store(self, model: str, entries: Dict[str, np.ndarray]):
+        db = SessionLocal()
+        try:
+            statement = insert(EmbeddingCacheEntry).values([
+                {
+                    "model": model,
+                    "content_hash": key_hash,
+                    "dimensions": int(vector.shape[0]),
+                    "embedding": vector.tobytes()
+                }
+                for key_hash, vector in entries.items()
+            ]).on_conflict_do_nothing(index_elements=["model", "content_hash"])
+            db.execute(statement)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Warning: Could not write embedding cache: {e}")
+        finally:
+            db.close()
+
+
+embedding_cache = EmbeddingCache(
+    max_size=settings.embedding_cache_size,
+    persist=settings.embedding_cache_persist
+)
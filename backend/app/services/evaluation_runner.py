@@ -0,0 +1,130 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.config import settings
+from app.models.database import EvaluationRun
+from app.services.db_service import SessionLocal
+from app.services.rag_service import RAGService
+
+ACTIVE_STATUSES = ("pending", "running")
+
+# Background workers for evaluation runs. Run state lives in the
+# evaluation_runs table, so any API worker can report on a run.
+_executor = ThreadPoolExecutor(
+    max_workers=settings.evaluation_run_workers,
+    thread_name_prefix="evaluation-run"
+)
+
+
+def get_active_run(db: Session, job_id: int) -> Optional[EvaluationRun]:
+    """Get the pending or running evaluation run for a job, if any."""
+    return db.query(EvaluationRun).filter(
+        EvaluationRun.job_id == job_id,
+        EvaluationRun.status.in_(ACTIVE_STATUSES)
+    ).order_by(EvaluationRun.created_at.desc()).first()
+
+
+def get_latest_run(db: Session, job_id: int) -> Optional[EvaluationRun]:
+    """Get the most recent evaluation run for a job, if any."""
+    return db.query(EvaluationRun).filter(
+        EvaluationRun.job_id == job_id
+    ).order_by(EvaluationRun.created_at.desc()).first()
+
+
+def expire_stale_runs(db: Session):
+    """
+    Mark runs that stayed active too long as failed.
+
+    A run is abandoned when the process executing it stops, so without
+    this it would block new runs for its job forever.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.evaluation_run_stale_seconds)
+    db.query(EvaluationRun).filter(
+        EvaluationRun.status.in_(ACTIVE_STATUSES),
+        EvaluationRun.created_at < cutoff
+    ).update({
+        EvaluationRun.status: "failed",
+        EvaluationRun.error: "Run did not finish; the worker may have restarted",
+        EvaluationRun.finished_at: datetime.utcnow()
+    }, synchronize_session=False)
+    db.commit()
+
+
+def start_evaluation_run(db: Session, job_id: int) -> EvaluationRun:
+    """
+    Queue a background evaluation run for a job.
+
+    Returns the already active run instead when one is pending or running
+    for the job. A unique index allows one active run per job, so when a
+    concurrent request queues a run first, that run is returned.
+
+    Args:
+        db: Database session
+        job_id: Job to evaluate
+
+    Returns:
+        The queued or active evaluation run
+    """
+    expire_stale_runs(db)
+    active = get_active_run(db, job_id)
+    if active:
+        return active
+
+    run = EvaluationRun(job_id=job_id, status="pending")
+    db.add(run)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        active = get_active_run(db, job_id)
+        if active:
+            return active
+        raise
+    db.refresh(run)
+
+    _executor.submit(_execute_run, run.id)
+    return run
+
+
+def _execute_run(run_id: int):
+    """Run retrieval and generation for an evaluation run, recording progress."""
+    db = SessionLocal()
+    try:
+        run = db.get(EvaluationRun, run_id)
+        run.status = "running"
+        run.started_at = datetime.utcnow()
+        db.commit()
+
+        def on_progress(evaluated: int, failed: int, total: int):
+            run.total_candidates = total
+            run.evaluated_count = evaluated
+            run.failed_count = failed
+            db.commit()
+
+        RAGService(db).evaluate_job_candidates(
+            job_id=run.job_id,
+            top_k=settings.evaluation_top_k,
+            on_progress=on_progress
+        )
+
+        run.status = "completed"
+        run.finished_at = datetime.utcnow()
+        db.commit()
+    except Exception as e:
+        print(f"Error in evaluation run {run_id}: {e}")
+        db.rollback()
+        run = db.get(EvaluationRun, run_id)
+        if run:
+            run.status = "failed"
+            run.error = str(e)
+            run.finished_at = datetime.utcnow()
+            db.commit()
+    finally:
+        db.close()
+
+
+def shutdown_evaluation_runner():
+    """Stop accepting runs; in-flight runs are abandoned."""
+    _executor.shutdown(wait=False, cancel_futures=True)
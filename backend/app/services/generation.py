@@ -1,10 +1,17 @@
 from openai import OpenAI
 from app.config import settings
 from typing import Dict
+import hashlib
 import json
 
 client = OpenAI(api_key=settings.openai_api_key)
 
+EVALUATION_MODEL = "gpt-4-turbo-preview"
+
+# Bump whenever SYSTEM_PROMPT or the evaluation prompt changes, so stored
+# evaluations produced by the old prompt are treated as stale
+PROMPT_VERSION = "1"
+
 SYSTEM_PROMPT = """You are an expert HR recruiter with 15+ years of experience in technical hiring. 
 Your task is to evaluate candidates objectively and provide detailed, actionable insights.
 
@@ -68,7 +75,7 @@ Recommendation Guidelines:
 """
 
         response = client.chat.completions.create(
-            model="gpt-4-turbo-preview",
+            model=EVALUATION_MODEL,
             messages=[
                 {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
@@ -101,3 +108,25 @@ Recommendation Guidelines:
     except Exception as e:
         raise Exception(f"Error evaluating candidate with GPT-4: {str(e)}")
 
+
+
+def evaluation_fingerprint(job_description: str, resume_text: str) -> Dict:
+    """
+    Identify the inputs an evaluation was produced from.
+    
+    An evaluation with the same fingerprint would come out of the same
+    prompt, so it can be reused instead of calling GPT-4 again.
+    
+    Args:
+        job_description: Job description text
+        resume_text: Candidate resume text
+    
+    Returns:
+        Dictionary with input hashes, prompt version and model name
+    """
+    return {
+        "job_description_hash": hashlib.sha256((job_description or "").encode("utf-8")).hexdigest(),
+        "resume_hash": hashlib.sha256((resume_text or "").encode("utf-8")).hexdigest(),
+        "prompt_version": PROMPT_VERSION,
+        "model": EVALUATION_MODEL
+    }
@@ -0,0 +1,150 @@
+import re
+from sqlalchemy.orm import sessionmaker
+from typing import Callable, Dict, List, Optional, Tuple
+from app.models.database import Job, Candidate, Evaluation
+from app.services.db_service import SessionLocal
+from app.services.metrics import metrics
+
+# Most candidates a top-N request returns
+MAX_TOP_N = 50
+DEFAULT_TOP_N = 5
+
+_END = r"\s*[?.!]*\s*$"
+_POLITE = r"^\s*(?:please\s+)?(?:(?:show|list|get|give|find|display|what\s+(?:is|are)|what's|who\s+(?:is|are))\s+)?(?:me\s+)?(?:the\s+)?"
+_JOB = r"(?:\s+(?:for|in|on|of)\s+(?:the\s+)?job\s*(?:#|id\s*)?(?P<job_id>\d+))?"
+_CANDIDATE = r"candidate\s*(?:#|id\s*)?(?P<candidate_id>\d+)"
+
+# Whole-message patterns; anything with extra wording is left to the agent
+TOP_CANDIDATES_PATTERNS = [
+    re.compile(_POLITE + r"(?:top|best)\s+(?P<n>\d+)?\s*(?:candidates?|applicants?)" + _JOB + _END, re.IGNORECASE),
+]
+CANDIDATE_EVALUATION_PATTERNS = [
+    re.compile(_POLITE + _CANDIDATE + r"(?:'s)?\s+(?:evaluation|scores?)" + _END, re.IGNORECASE),
+    re.compile(_POLITE + r"(?:evaluation|scores?)\s+(?:for|of)\s+" + _CANDIDATE + _END, re.IGNORECASE),
+]
+
+
+class IntentRouter:
+    """
+    Deterministic fast path for structured requests.
+
+    Requests such as "top 5 candidates for job 3" or "show candidate 42's
+    evaluation" are answered straight from the evaluations table instead
+    of going through the agent's tool-calling loop. route() returns None
+    for anything else, including requests whose data has not been
+    computed yet, so the agent can handle them.
+    """
+
+    def __init__(self, session_factory: sessionmaker = SessionLocal):
+        self.session_factory = session_factory
+        self._intents: List[Tuple[str, list, Callable]] = [
+            ("top_candidates", TOP_CANDIDATES_PATTERNS, self._top_candidates),
+            ("candidate_evaluation", CANDIDATE_EVALUATION_PATTERNS, self._candidate_evaluation),
+        ]
+
+    def route(self, message: str, job_id: Optional[int] = None) -> Optional[Dict]:
+        """
+        Answer a message directly if it is a recognized structured request.
+
+        Args:
+            message: User message
+            job_id: The session's job, used when the message names none
+
+        Returns:
+            Dictionary with intent, arguments and response, or None to
+            fall through to the agent
+        """
+        for intent, patterns, handler in self._intents:
+            for pattern in patterns:
+                match = pattern.match(message)
+                if not match:
+                    continue
+
+                arguments = {key: int(value) for key, value in match.groupdict().items() if value}
+                try:
+                    response = handler(arguments, job_id)
+                except Exception as e:
+                    print(f"Warning: Fast path {intent} failed: {e}")
+                    response = None
+
+                if response is None:
+                    metrics.increment("intent_router.fallthrough")
+                    return None
+                metrics.increment("intent_router.fast_path")
+                metrics.increment(f"intent_router.fast_path.{intent}")
+                return {"intent": intent, "arguments": arguments, "response": response}
+
+        metrics.increment("intent_router.fallthrough")
+        return None
+
+    def _top_candidates(self, arguments: Dict, session_job_id: Optional[int]) -> Optional[str]:
+        job_id = arguments.get("job_id", session_job_id)
+        if job_id is None:
+            return None
+        n = min(arguments.get("n", DEFAULT_TOP_N), MAX_TOP_N)
+        arguments.update(job_id=job_id, n=n)
+
+        db = self.session_factory()
+        try:
+            job = db.get(Job, job_id)
+            if not job:
+                return f"Job {job_id} not found."
+
+            rows = db.query(Evaluation, Candidate.name).join(
+                Candidate, Evaluation.candidate_id == Candidate.id
+            ).filter(
+                Candidate.job_id == job_id
+            ).order_by(
+                Evaluation.overall_score.desc()
+            ).limit(n).all()
+        finally:
+            db.close()
+
+        if not rows:
+            # Nothing evaluated yet; the agent can run the evaluation
+            return None
+
+        lines = [f"Top {len(rows)} candidates for job {job_id} ({job.title}):", ""]
+        for rank, (evaluation, name) in enumerate(rows, start=1):
+            lines.append(
+                f"{rank}. {name or 'Unknown'} (candidate {evaluation.candidate_id}) - "
+                f"overall {evaluation.overall_score:.1f}, {evaluation.recommendation}"
+            )
+        return "\n".join(lines)
+
+    def _candidate_evaluation(self, arguments: Dict, session_job_id: Optional[int]) -> Optional[str]:
+        candidate_id = arguments["candidate_id"]
+
+        db = self.session_factory()
+        try:
+            candidate = db.get(Candidate, candidate_id)
+            if not candidate:
+                return f"Candidate {candidate_id} not found."
+            evaluation = db.query(Evaluation).filter(
+                Evaluation.candidate_id == candidate_id
+            ).first()
+        finally:
+            db.close()
+
+        if not evaluation:
+            return None
+
+        lines = [
+            f"Evaluation for {candidate.name or 'Unknown'} (candidate {candidate_id}, job {candidate.job_id}):",
+            "",
+            f"- Overall: {evaluation.overall_score:.1f}",
+            f"- Technical: {evaluation.technical_score:.1f}",
+            f"- Experience: {evaluation.experience_score:.1f}",
+            f"- Education: {evaluation.education_score:.1f}",
+            f"- Recommendation: {evaluation.recommendation}",
+        ]
+        if evaluation.strengths:
+            lines.append("- Strengths: " + "; ".join(evaluation.strengths))
+        if evaluation.concerns:
+            lines.append("- Concerns: " + "; ".join(evaluation.concerns))
+        if evaluation.ai_analysis:
+            lines += ["", evaluation.ai_analysis]
+        return "\n".join(lines)
+
+
+intent_router = IntentRouter()
@@ -0,0 +1,45 @@
+import threading
+from collections import defaultdict
+from typing import Dict
+
+
+class Metrics:
+    """In-process counters and value observations exposed on /metrics."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(int)
+        self._observations = {}
+    
+    def increment(self, name: str, value: int = 1):
+        """Add to a counter."""
+        with self._lock:
+            self._counters[name] += value
+    
+    def observe(self, name: str, value: float):
+        """Record a value, keeping count, total, max and last."""
+        with self._lock:
+            stats = self._observations.setdefault(
+                name, {"count": 0, "total": 0.0, "max": 0.0, "last": 0.0}
+            )
+            stats["count"] += 1
+            stats["total"] += value
+            stats["max"] = max(stats["max"], value)
+            stats["last"] = value
+    
+    def snapshot(self) -> Dict:
+        """Get a copy of all counters and observations."""
+        with self._lock:
+            observations = {}
+            for name, stats in self._observations.items():
+                observations[name] = {
+                    **stats,
+                    "avg": stats["total"] / stats["count"] if stats["count"] else 0.0
+                }
+            return {
+                "counters": dict(self._counters),
+                "observations": observations
+            }
+
+
+metrics = Metrics()
@@ -1,35 +1,82 @@
-from app.services.retrieval import retrieval_service
-from app.services.generation import evaluate_candidate
+from app.services.retrieval import retrieval_service, has_legacy_vectors
+from app.services.generation import evaluate_candidate, evaluation_fingerprint
+from app.services.metrics import metrics
+from app.services.db_service import SessionLocal, session_scope
 from app.models.database import Candidate, Evaluation, Job
-from sqlalchemy.orm import Session
-from typing import List
+from app.config import settings
+from sqlalchemy.orm import Session, selectinload, sessionmaker
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Dict, Optional, Tuple
 from app.models.schemas import EvaluationResponse
 
+# Evaluation fields persisted on the Evaluation model
+EVALUATION_FIELDS = [
+    "overall_score",
+    "technical_score",
+    "experience_score",
+    "education_score",
+    "strengths",
+    "concerns",
+    "recommendation",
+    "ai_analysis",
+]
+
+# Fingerprint fields identifying the inputs of a stored evaluation
+FINGERPRINT_FIELDS = [
+    "job_description_hash",
+    "resume_hash",
+    "prompt_version",
+    "model",
+]
+
 
 class RAGService:
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        max_concurrency: Optional[int] = None,
+        session_factory: sessionmaker = SessionLocal
+    ):
         self.db = db
+        self.session_factory = session_factory
+        self.max_concurrency = max_concurrency or settings.evaluation_concurrency
     
-    def evaluate_job_candidates(self, job_id: int, top_k: int = 15) -> List[EvaluationResponse]:
+    def evaluate_job_candidates(
+        self,
+        job_id: int,
+        top_k: int = 15,
+        on_progress: Optional[Callable[[int, int, int], None]] = None,
+        top_n: int = 5
+    ) -> List[EvaluationResponse]:
         """
         Complete RAG pipeline: Retrieve top candidates and generate evaluations.
         
         Args:
             job_id: Job ID to evaluate candidates for
             top_k: Number of candidates to retrieve for evaluation
+            on_progress: Optional callback receiving (evaluated, failed, total)
+                as candidate evaluations finish
+            top_n: Number of ranked evaluations to return
         
         Returns:
-            List of top 5 evaluation responses
+            List of top_n evaluation responses
         """
         # Get job
         job = self.db.query(Job).filter(Job.id == job_id).first()
         if not job:
             raise ValueError(f"Job {job_id} not found")
+        job_description = job.description
+        include_legacy = has_legacy_vectors(self.db, job_id)
+        
+        # No connection is held during the embedding and vector store calls
+        self.db.commit()
         
         # RETRIEVAL: Get top K candidates using vector similarity
         matches = retrieval_service.retrieve_top_k(
-            job_description=job.description,
-            top_k=top_k
+            job_description=job_description,
+            top_k=top_k,
+            job_id=job_id,
+            include_legacy=include_legacy
         )
         
         if not matches:
@@ -39,70 +86,238 @@ class RAGService:
         candidate_ids = [match["candidate_id"] for match in matches if match.get("candidate_id")]
         
         # Get candidates from database
-        candidates = self.db.query(Candidate).filter(
+        candidates = self.db.query(Candidate).options(
+            selectinload(Candidate.resume)
+        ).filter(
             Candidate.id.in_(candidate_ids),
             Candidate.job_id == job_id
         ).all()
+        names = {candidate.id: candidate.name for candidate in candidates}
         
-        # GENERATION: Evaluate each retrieved candidate
-        evaluations = []
-        for candidate in candidates:
-            try:
-                # Generate evaluation using GPT-4
-                evaluation_data = evaluate_candidate(
-                    job_description=job.description,
-                    resume_text=candidate.resume_text
-                )
-                
-                # Save evaluation to database
-                evaluation = Evaluation(
-                    candidate_id=candidate.id,
-                    overall_score=evaluation_data["overall_score"],
-                    technical_score=evaluation_data["technical_score"],
-                    experience_score=evaluation_data["experience_score"],
-                    education_score=evaluation_data["education_score"],
-                    strengths=evaluation_data["strengths"],
-                    concerns=evaluation_data["concerns"],
-                    recommendation=evaluation_data["recommendation"],
-                    ai_analysis=evaluation_data.get("ai_analysis", "")
-                )
-                
-                # Update or create evaluation
-                existing = self.db.query(Evaluation).filter(
-                    Evaluation.candidate_id == candidate.id
-                ).first()
-                
-                if existing:
-                    for key, value in evaluation_data.items():
-                        if key != "ai_analysis":
-                            setattr(existing, key, value)
-                    existing.ai_analysis = evaluation_data.get("ai_analysis", "")
-                else:
-                    self.db.add(evaluation)
-                
-                self.db.commit()
-                
-                # Create response
-                eval_response = EvaluationResponse(
-                    candidate_id=candidate.id,
-                    candidate_name=candidate.name or "Unknown",
-                    overall_score=evaluation_data["overall_score"],
-                    technical_score=evaluation_data["technical_score"],
-                    experience_score=evaluation_data["experience_score"],
-                    education_score=evaluation_data["education_score"],
-                    strengths=evaluation_data["strengths"],
-                    concerns=evaluation_data["concerns"],
-                    recommendation=evaluation_data["recommendation"],
-                    ai_analysis=evaluation_data.get("ai_analysis")
-                )
-                
-                evaluations.append(eval_response)
-                
-            except Exception as e:
-                print(f"Error evaluating candidate {candidate.id}: {e}")
-                continue
+        # GENERATION: Reuse fresh evaluations, evaluate the rest concurrently
+        results = self.get_or_evaluate(job, candidates, on_progress=on_progress)
         
-        # RANKING: Sort by overall score and return top 5
+        evaluations = [
+            EvaluationResponse(
+                candidate_id=candidate_id,
+                candidate_name=name or "Unknown",
+                overall_score=results[candidate_id]["overall_score"],
+                technical_score=results[candidate_id]["technical_score"],
+                experience_score=results[candidate_id]["experience_score"],
+                education_score=results[candidate_id]["education_score"],
+                strengths=results[candidate_id]["strengths"],
+                concerns=results[candidate_id]["concerns"],
+                recommendation=results[candidate_id]["recommendation"],
+                ai_analysis=results[candidate_id].get("ai_analysis")
+            )
+            for candidate_id, name in names.items()
+            if candidate_id in results
+        ]
+        
+        # RANKING: Sort by overall score and return top N
         evaluations.sort(key=lambda x: x.overall_score, reverse=True)
-        return evaluations[:5]
-
+        return evaluations[:top_n]
+    
+    def get_or_evaluate(
+        self,
+        job: Job,
+        candidates: List[Candidate],
+        on_progress: Optional[Callable[[int, int, int], None]] = None
+    ) -> Dict[int, Dict]:
+        """
+        Get evaluations for candidates, calling GPT-4 only when needed.
+        
+        A stored evaluation is reused when its fingerprint (job description
+        and resume hashes, prompt version and model) matches the current
+        inputs. New candidates and candidates whose inputs changed are
+        evaluated concurrently and saved in one transaction.
+        
+        The read transaction is committed before any GPT-4 call, so no
+        connection is held while evaluations run; results are saved in a
+        separate short session.
+        
+        Args:
+            job: Job to evaluate against
+            candidates: Candidates to evaluate
+            on_progress: Optional callback receiving (evaluated, failed, total)
+        
+        Returns:
+            Dictionary mapping candidate ID to evaluation data
+        """
+        if not candidates:
+            return {}
+        
+        job_description = job.description
+        resumes = {candidate.id: candidate.resume_text or "" for candidate in candidates}
+        results, fingerprints = self.find_fresh_evaluations(job_description, resumes)
+        
+        # Release the connection before the slow part
+        self.db.commit()
+        
+        total = len(resumes)
+        progress = {"evaluated": len(results), "failed": 0}
+        
+        def on_result(candidate_id: int, succeeded: bool):
+            progress["evaluated" if succeeded else "failed"] += 1
+            if on_progress:
+                on_progress(progress["evaluated"], progress["failed"], total)
+        
+        if on_progress:
+            on_progress(progress["evaluated"], progress["failed"], total)
+        
+        results.update(self.evaluate_and_save(
+            job_description,
+            {candidate_id: resumes[candidate_id] for candidate_id in fingerprints},
+            fingerprints,
+            on_result=on_result
+        ))
+        return results
+    
+    def find_fresh_evaluations(
+        self,
+        job_description: str,
+        resumes: Dict[int, str]
+    ) -> Tuple[Dict[int, Dict], Dict[int, Dict]]:
+        """
+        Split candidates into those with an up-to-date stored evaluation and the rest.
+        
+        Args:
+            job_description: Job description text
+            resumes: Dictionary mapping candidate ID to resume text
+        
+        Returns:
+            Tuple of (evaluation data for fresh candidates, fingerprints of
+            the candidates that need evaluating), both keyed by candidate ID
+        """
+        existing = {
+            evaluation.candidate_id: evaluation
+            for evaluation in self.db.query(Evaluation).filter(
+                Evaluation.candidate_id.in_(list(resumes))
+            ).all()
+        }
+        
+        results = {}
+        fingerprints = {}
+        for candidate_id, resume_text in resumes.items():
+            fingerprint = evaluation_fingerprint(job_description, resume_text)
+            evaluation = existing.get(candidate_id)
+            if evaluation and all(getattr(evaluation, field) == value for field, value in fingerprint.items()):
+                results[candidate_id] = {
+                    field: getattr(evaluation, field) for field in EVALUATION_FIELDS
+                }
+            else:
+                fingerprints[candidate_id] = fingerprint
+        
+        metrics.increment("evaluation_cache.hits", len(results))
+        metrics.increment("evaluation_cache.misses", len(fingerprints))
+        return results, fingerprints
+    
+    def evaluate_and_save(
+        self,
+        job_description: str,
+        resumes: Dict[int, str],
+        fingerprints: Dict[int, Dict],
+        on_result: Optional[Callable[[int, bool], None]] = None
+    ) -> Dict[int, Dict]:
+        """
+        Evaluate candidates concurrently and save the results with their fingerprints.
+        
+        Call this without an open transaction; saving uses its own session.
+        A failed save is logged and the evaluations are still returned.
+        
+        Args:
+            job_description: Job description text
+            resumes: Dictionary mapping candidate ID to resume text
+            fingerprints: Fingerprints from find_fresh_evaluations
+            on_result: Optional callback receiving (candidate_id, succeeded)
+        
+        Returns:
+            Dictionary mapping candidate ID to evaluation data
+        """
+        evaluated = self.evaluate_concurrently(job_description, resumes, on_result=on_result)
+        for candidate_id, evaluation_data in evaluated.items():
+            evaluation_data.update(fingerprints[candidate_id])
+        
+        try:
+            self.save_evaluations(evaluated)
+        except Exception as e:
+            print(f"Error saving evaluations: {e}")
+        
+        return evaluated
+    
+    def evaluate_concurrently(
+        self,
+        job_description: str,
+        resumes: Dict[int, str],
+        on_result: Optional[Callable[[int, bool], None]] = None
+    ) -> Dict[int, Dict]:
+        """
+        Run GPT-4 evaluations for several candidates in parallel.
+        
+        At most max_concurrency evaluations are in flight at once. A failed
+        evaluation is logged and left out of the results without affecting
+        the others.
+        
+        Args:
+            job_description: Job description text
+            resumes: Dictionary mapping candidate ID to resume text
+            on_result: Optional callback receiving (candidate_id, succeeded)
+                as each evaluation finishes
+        
+        Returns:
+            Dictionary mapping candidate ID to evaluation data
+        """
+        if not resumes:
+            return {}
+        
+        results = {}
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(resumes))) as pool:
+            futures = {
+                pool.submit(evaluate_candidate, job_description, resume_text): candidate_id
+                for candidate_id, resume_text in resumes.items()
+            }
+            for future in as_completed(futures):
+                candidate_id = futures[future]
+                try:
+                    results[candidate_id] = future.result()
+                except Exception as e:
+                    print(f"Error evaluating candidate {candidate_id}: {e}")
+                if on_result:
+                    on_result(candidate_id, candidate_id in results)
+        
+        return results
+    
+    def save_evaluations(self, results: Dict[int, Dict]):
+        """
+        Create or update Evaluation rows for many candidates in one transaction.
+        
+        Uses a short session of its own, so it can be called after the
+        caller's transaction has ended.
+        
+        Args:
+            results: Dictionary mapping candidate ID to evaluation data,
+                optionally including fingerprint fields
+        """
+        if not results:
+            return
+        
+        with session_scope(self.session_factory) as db:
+            existing = {
+                evaluation.candidate_id: evaluation
+                for evaluation in db.query(Evaluation).filter(
+                    Evaluation.candidate_id.in_(list(results))
+                ).all()
+            }
+            
+            for candidate_id, evaluation_data in results.items():
+                values = {field: evaluation_data.get(field) for field in EVALUATION_FIELDS + FINGERPRINT_FIELDS}
+                values["ai_analysis"] = values["ai_analysis"] or ""
+                
+                evaluation = existing.get(candidate_id)
+                if evaluation:
+                    for field, value in values.items():
+                        setattr(evaluation, field, value)
+                else:
+                    db.add(Evaluation(candidate_id=candidate_id, **values))
+            
+            db.commit()
@@ -1,6 +1,18 @@
 import pdfplumber
-from typing import Optional
+from typing import Optional, List, Dict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+import asyncio
+import signal
 import os
+from app.config import settings
+from app.services.skill_extractor import extract_skills
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
 
 
 def extract_text_from_pdf(file_path: str) -> str:
@@ -49,3 +61,134 @@ def extract_email_from_resume(text: str) -> Optional[str]:
     matches = re.findall(email_pattern, text)
     return matches[0] if matches else None
 
+
+# Parallel parsing
+#
+# pdfplumber is CPU-bound, so resumes are parsed in a pool of worker processes
+# instead of on the API event loop. Each worker has its address space capped
+# and every file gets an alarm-based timeout, so a single malformed PDF fails
+# on its own instead of stalling the whole upload.
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+
+
+class ParseTimeoutError(Exception):
+    """Raised inside a parse worker when a PDF exceeds its time budget."""
+
+
+def _init_parse_worker(memory_limit_mb: int):
+    """Apply the memory cap to a freshly started parse worker."""
+    if resource is not None and memory_limit_mb:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _raise_parse_timeout(signum, frame):
+    raise ParseTimeoutError("Timed out while parsing PDF")
+
+
+def parse_resume_file(file_path: str, timeout: int) -> Dict:
+    """
+    Parse a single resume. Runs inside a parse worker process.
+    
+    Args:
+        file_path: Path to the saved PDF file
+        timeout: Seconds allowed for text extraction
+    
+    Returns:
+        Dictionary with extracted text, name, email and skills
+    """
+    use_alarm = bool(timeout) and hasattr(signal, "SIGALRM")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_parse_timeout)
+        signal.alarm(timeout)
+    try:
+        text = extract_text_from_pdf(file_path)
+    finally:
+        if use_alarm:
+            signal.alarm(0)
+    
+    return {
+        "text": text,
+        "name": extract_name_from_resume(text) if text else None,
+        "email": extract_email_from_resume(text) if text else None,
+        "skills": extract_skills(text) if text else []
+    }
+
+
+def _parse_worker_count() -> int:
+    return settings.parse_workers or os.cpu_count() or 1
+
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    """Get the shared parse pool, starting it on first use."""
+    global _parse_pool
+    if _parse_pool is None:
+        # Spawned (not forked) workers start small, so the memory cap applies
+        # to the parser itself rather than a copy of the API process.
+        _parse_pool = ProcessPoolExecutor(
+            max_workers=_parse_worker_count(),
+            mp_context=get_context("spawn"),
+            initializer=_init_parse_worker,
+            initargs=(settings.parse_memory_limit_mb,)
+        )
+    return _parse_pool
+
+
+def _reset_parse_pool(broken_pool: ProcessPoolExecutor):
+    """Replace the parse pool after a worker crashed."""
+    global _parse_pool
+    if _parse_pool is broken_pool:
+        _parse_pool = None
+        broken_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_parse_pool():
+    """Stop the parse worker processes."""
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(wait=False, cancel_futures=True)
+        _parse_pool = None
+
+
+async def parse_resumes(file_paths: List[str]) -> List[Dict]:
+    """
+    Parse many resumes in parallel across worker processes.
+    
+    Args:
+        file_paths: Paths to saved PDF files
+    
+    Returns:
+        One result per input path, in input order. Each result has
+        text, name, email, skills and error (None on success).
+    """
+    loop = asyncio.get_running_loop()
+    timeout = settings.parse_timeout_seconds
+    # Only hand a file to the pool when a worker is free, so the backstop
+    # timeout below measures parse time rather than time spent queued.
+    slots = asyncio.Semaphore(_parse_worker_count())
+    
+    async def parse_one(file_path: str) -> Dict:
+        async with slots:
+            for attempt in range(2):
+                pool = _get_parse_pool()
+                try:
+                    future = loop.run_in_executor(pool, parse_resume_file, file_path, timeout)
+                    result = await asyncio.wait_for(future, timeout=timeout + 5)
+                    result["error"] = None
+                    return result
+                except asyncio.TimeoutError:
+                    error = f"Timed out after {timeout}s"
+                    break
+                except BrokenProcessPool:
+                    # A worker died (e.g. hit the memory cap hard); every
+                    # in-flight file fails with it, so retry once on a new pool
+                    _reset_parse_pool(pool)
+                    error = "Parser process crashed"
+                except Exception as e:
+                    error = str(e)
+                    break
+        
+        return {"text": None, "name": None, "email": None, "skills": [], "error": error}
+    
+    return await asyncio.gather(*(parse_one(path) for path in file_paths))
@@ -1,79 +1,141 @@
-from pinecone import Pinecone
 from app.config import settings
-from app.services.embedding import get_embedding
-from typing import List, Dict
+from app.services.embedding import get_embedding, get_embeddings
+from app.services.vector_store import VectorStore, create_vector_store
+from app.models.database import Candidate
+from sqlalchemy.orm import Session
+from typing import List, Dict, Optional
+import threading
 import uuid
 
+# Vectors per upsert request
+UPSERT_BATCH_SIZE = 100
+
+# Namespace of vectors written before job-scoped namespaces existed
+LEGACY_NAMESPACE = ""
+
+
+def job_namespace(job_id: Optional[int]) -> str:
+    """Vector store namespace holding a job's resume vectors."""
+    return f"job_{job_id}" if job_id is not None else LEGACY_NAMESPACE
+
+
+def has_legacy_vectors(db: Session, job_id: int) -> bool:
+    """
+    Whether a job has resume vectors that predate job namespaces.
+    
+    Vectors written to a job's namespace have IDs prefixed with it, so a
+    job needs the legacy fallback only until /reindex has moved them all.
+    """
+    if not settings.vector_legacy_fallback:
+        return False
+    return db.query(
+        db.query(Candidate.id).filter(
+            Candidate.job_id == job_id,
+            Candidate.pinecone_id.isnot(None),
+            ~Candidate.pinecone_id.startswith(f"{job_namespace(job_id)}:", autoescape=True)
+        ).exists()
+    ).scalar()
+
 
 class RetrievalService:
-    def __init__(self):
-        self.pc = Pinecone(api_key=settings.pinecone_api_key)
-        self.index_name = settings.pinecone_index_name
-        self._ensure_index()
+    def __init__(self, store: Optional[VectorStore] = None):
+        self._store = store
+        self._store_lock = threading.Lock()
     
-    def _ensure_index(self):
-        """Ensure Pinecone index exists, create if not."""
-        try:
-            # Check if index exists
-            existing_indexes = [idx.name for idx in self.pc.list_indexes()]
-            if self.index_name not in existing_indexes:
-                # Create index with dimension 1536 (text-embedding-3-small)
-                self.pc.create_index(
-                    name=self.index_name,
-                    dimension=1536,
-                    metric="cosine"
-                )
-        except Exception as e:
-            print(f"Warning: Could not ensure index exists: {e}")
+    @property
+    def store(self) -> VectorStore:
+        """Vector store backend, created on first use."""
+        if self._store is None:
+            with self._store_lock:
+                if self._store is None:
+                    self._store = create_vector_store()
+        return self._store
     
-    def upsert_resume(self, candidate_id: int, resume_text: str, metadata: Dict = None) -> str:
+    def upsert_resume(self, candidate_id: int, resume_text: str, metadata: Dict = None, job_id: Optional[int] = None) -> str:
         """
-        Store resume embedding in Pinecone.
+        Store resume embedding in the vector store.
         
         Args:
             candidate_id: Database candidate ID
             resume_text: Resume text content
             metadata: Additional metadata to store
+            job_id: Job the candidate applied to; selects the namespace
         
         Returns:
-            Pinecone ID for the vector
+            Vector ID (stored as Candidate.pinecone_id)
+        """
+        return self.upsert_resumes([{
+            "candidate_id": candidate_id,
+            "resume_text": resume_text,
+            "metadata": metadata
+        }], job_id=job_id)[0]
+    
+    def upsert_resumes(self, resumes: List[Dict], job_id: Optional[int] = None) -> List[str]:
+        """
+        Store many resume embeddings in the vector store using batched embedding calls.
+        
+        Args:
+            resumes: List of dicts with candidate_id, resume_text and optional metadata
+            job_id: Job the candidates applied to; vectors go to the job's namespace
+        
+        Returns:
+            Vector IDs, in the same order as resumes
         """
         try:
-            # Generate embedding
-            embedding = get_embedding(resume_text)
-            
-            # Create unique ID
-            pinecone_id = f"candidate_{candidate_id}_{uuid.uuid4().hex[:8]}"
-            
-            # Prepare metadata
-            vector_metadata = {
-                "candidate_id": candidate_id,
-                "resume_text": resume_text[:1000]  # Store first 1000 chars for reference
-            }
-            if metadata:
-                vector_metadata.update(metadata)
+            # Generate embeddings in as few API calls as possible
+            embeddings = get_embeddings([resume["resume_text"] for resume in resumes])
             
-            # Upsert to Pinecone
-            index = self.pc.Index(self.index_name)
-            index.upsert(
-                vectors=[{
+            vectors = []
+            namespace = job_namespace(job_id)
+            for resume, embedding in zip(resumes, embeddings):
+                candidate_id = resume["candidate_id"]
+                
+                # Create unique ID, prefixed with the job namespace so
+                # has_legacy_vectors can tell reindexed candidates apart
+                pinecone_id = f"candidate_{candidate_id}_{uuid.uuid4().hex[:8]}"
+                if namespace != LEGACY_NAMESPACE:
+                    pinecone_id = f"{namespace}:{pinecone_id}"
+                
+                # Prepare metadata
+                vector_metadata = {
+                    "candidate_id": candidate_id,
+                    "resume_text": resume["resume_text"][:1000]  # Store first 1000 chars for reference
+                }
+                if job_id is not None:
+                    vector_metadata["job_id"] = job_id
+                if resume.get("metadata"):
+                    vector_metadata.update(resume["metadata"])
+                
+                vectors.append({
                     "id": pinecone_id,
                     "values": embedding,
                     "metadata": vector_metadata
-                }]
-            )
+                })
+            
+            # Upsert to the vector store, keeping each request under the size limit
+            for i in range(0, len(vectors), UPSERT_BATCH_SIZE):
+                self.store.upsert(namespace, vectors[i:i + UPSERT_BATCH_SIZE])
             
-            return pinecone_id
+            return [vector["id"] for vector in vectors]
         except Exception as e:
-            raise Exception(f"Error upserting resume to Pinecone: {str(e)}")
+            raise Exception(f"Error upserting resumes to vector store: {str(e)}")
     
-    def retrieve_top_k(self, job_description: str, top_k: int = 15) -> List[Dict]:
+    def retrieve_top_k(
+        self,
+        job_description: str,
+        top_k: int = 15,
+        job_id: Optional[int] = None,
+        include_legacy: bool = False
+    ) -> List[Dict]:
         """
         Retrieve top K candidates using vector similarity search.
         
         Args:
             job_description: Job description text
             top_k: Number of top candidates to retrieve
+            job_id: Restrict the search to this job's candidates
+            include_legacy: Also search vectors written before job
+                namespaces; see has_legacy_vectors
         
         Returns:
             List of candidate matches with scores and metadata
@@ -82,36 +144,78 @@ class RetrievalService:
             # Generate embedding for job description
             job_embedding = get_embedding(job_description)
             
-            # Query Pinecone
-            index = self.pc.Index(self.index_name)
-            results = index.query(
-                vector=job_embedding,
-                top_k=top_k,
-                include_metadata=True
+            # Query the vector store, scoped to the job's namespace when given
+            matches = self._format_matches(
+                self.store.query(job_namespace(job_id), job_embedding, top_k)
             )
             
-            # Format results
-            matches = []
-            for match in results.matches:
-                matches.append({
-                    "pinecone_id": match.id,
-                    "candidate_id": match.metadata.get("candidate_id"),
-                    "score": match.score,
-                    "metadata": match.metadata
-                })
+            # Vectors uploaded before job namespaces live in the default
+            # namespace; filter them by job_id until the job is reindexed
+            if job_id is not None and include_legacy:
+                legacy_results = self.store.query(
+                    LEGACY_NAMESPACE,
+                    job_embedding,
+                    top_k,
+                    filter={"job_id": {"$eq": job_id}}
+                )
+                seen = {match["candidate_id"] for match in matches}
+                matches.extend(
+                    match for match in self._format_matches(legacy_results)
+                    if match["candidate_id"] not in seen
+                )
+                matches.sort(key=lambda match: match["score"], reverse=True)
+                matches = matches[:top_k]
             
             return matches
         except Exception as e:
-            raise Exception(f"Error retrieving candidates from Pinecone: {str(e)}")
+            raise Exception(f"Error retrieving candidates from vector store: {str(e)}")
+    
+    def _format_matches(self, results: List[Dict]) -> List[Dict]:
+        """Convert vector store results into candidate match dictionaries."""
+        matches = []
+        for match in results:
+            matches.append({
+                "pinecone_id": match["id"],
+                "candidate_id": match["metadata"].get("candidate_id"),
+                "score": match["score"],
+                "metadata": match["metadata"]
+            })
+        return matches
+    
+    def reindex_job(self, job_id: int, candidates: List[Dict]) -> List[str]:
+        """
+        Move a job's resume vectors into the job's namespace.
+        
+        Re-embeds each resume (served from the embedding cache when possible),
+        writes it to the job namespace and removes the old vector.
+        
+        Args:
+            job_id: Job to reindex
+            candidates: List of dicts with candidate_id, resume_text,
+                pinecone_id (old vector ID or None) and optional metadata
+        
+        Returns:
+            New vector IDs, in the same order as candidates
+        """
+        pinecone_ids = self.upsert_resumes(candidates, job_id=job_id)
+        
+        old_ids = [candidate["pinecone_id"] for candidate in candidates if candidate.get("pinecone_id")]
+        if old_ids:
+            try:
+                for namespace in (LEGACY_NAMESPACE, job_namespace(job_id)):
+                    for i in range(0, len(old_ids), UPSERT_BATCH_SIZE):
+                        self.store.delete(namespace, old_ids[i:i + UPSERT_BATCH_SIZE])
+            except Exception as e:
+                print(f"Warning: Could not delete old vectors from vector store: {e}")
+        
+        return pinecone_ids
     
-    def delete_resume(self, pinecone_id: str):
-        """Delete a resume vector from Pinecone."""
+    def delete_resume(self, pinecone_id: str, job_id: Optional[int] = None):
+        """Delete a resume vector from the vector store."""
         try:
-            index = self.pc.Index(self.index_name)
-            index.delete(ids=[pinecone_id])
+            self.store.delete(job_namespace(job_id), [pinecone_id])
         except Exception as e:
-            print(f"Warning: Could not delete from Pinecone: {e}")
-
+            print(f"Warning: Could not delete from vector store: {e}")
 
 retrieval_service = RetrievalService()
 
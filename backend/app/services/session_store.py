@@ -0,0 +1,188 @@
+from collections import OrderedDict
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional
+import threading
+import time
+from app.config import settings
+from app.services.agent_service import HRAgent
+from app.services.metrics import metrics
+
+
+class _SessionEntry:
+    def __init__(self, agent: HRAgent, memory_version: Optional[datetime]):
+        self.agent = agent
+        self.memory_version = memory_version
+        self.last_used = time.monotonic()
+        self.memory_bytes = agent.memory_size()
+
+
+class AgentSessionStore:
+    """
+    Bounded, per-worker cache of agent instances keyed by chat session ID.
+
+    Sessions are evicted least-recently-used first when there are more than
+    max_sessions of them or their conversation memory exceeds
+    max_memory_bytes, and whenever they have been idle for ttl_seconds.
+    The store is only a cache: chat messages are persisted, so an evicted
+    or unknown session is rebuilt from its history on any worker.
+
+    Each agent records the memory version it was built from, the session's
+    memory_cleared_at. A cached agent whose version no longer matches the
+    session row, because its memory was cleared on another worker, is
+    rebuilt instead of served.
+    """
+
+    def __init__(self, max_sessions: int, ttl_seconds: int, max_memory_bytes: int):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_bytes = max_memory_bytes
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, _SessionEntry]" = OrderedDict()
+        self._memory_bytes = 0
+
+    def get(self, session_id: str) -> Optional[HRAgent]:
+        """Get a cached agent without creating one."""
+        with self._lock:
+            self._evict_expired()
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            entry.last_used = time.monotonic()
+            self._sessions.move_to_end(session_id)
+            return entry.agent
+
+    def get_or_create(
+        self,
+        session_id: str,
+        factory: Callable[[], HRAgent],
+        memory_version: Optional[datetime] = None
+    ) -> HRAgent:
+        """
+        Get the agent for a session, building it with factory when missing or stale.
+
+        Args:
+            session_id: Chat session ID
+            factory: Builds an agent with its memory rehydrated from history
+            memory_version: The session's current memory_cleared_at
+
+        Returns:
+            The session's agent
+        """
+        agent = self._get_current(session_id, memory_version)
+        if agent is not None:
+            metrics.increment("agent_sessions.hits")
+            return agent
+
+        # Build outside the lock; rehydration reads from the database
+        agent = factory()
+        metrics.increment("agent_sessions.rebuilt")
+        return self._add(session_id, agent, memory_version)
+
+    async def aget_or_create(
+        self,
+        session_id: str,
+        factory: Callable[[], Awaitable[HRAgent]],
+        memory_version: Optional[datetime] = None
+    ) -> HRAgent:
+        """Async get_or_create, for factories that load history with an AsyncSession."""
+        agent = self._get_current(session_id, memory_version)
+        if agent is not None:
+            metrics.increment("agent_sessions.hits")
+            return agent
+
+        agent = await factory()
+        metrics.increment("agent_sessions.rebuilt")
+        return self._add(session_id, agent, memory_version)
+
+    def set_memory_version(self, session_id: str, memory_version: Optional[datetime]):
+        """Record that a cached agent's memory matches memory_version, e.g. after clearing it in place."""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                entry.memory_version = memory_version
+
+    def _get_current(self, session_id: str, memory_version: Optional[datetime]) -> Optional[HRAgent]:
+        """Get a cached agent if it was built from memory_version, dropping it otherwise."""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None and entry.memory_version != memory_version:
+                # Memory was cleared on another worker since the agent was built
+                self._remove(session_id)
+                metrics.increment("agent_sessions.stale")
+        return self.get(session_id)
+
+    def _add(self, session_id: str, agent: HRAgent, memory_version: Optional[datetime]) -> HRAgent:
+        """Cache a newly built agent unless another request cached a current one first."""
+        with self._lock:
+            existing = self._sessions.get(session_id)
+            if existing is not None:
+                if existing.memory_version == memory_version:
+                    # Another request rebuilt it first
+                    return existing.agent
+                self._remove(session_id)
+            entry = _SessionEntry(agent, memory_version)
+            self._sessions[session_id] = entry
+            self._memory_bytes += entry.memory_bytes
+            self._evict_over_budget()
+        return agent
+
+    def touch(self, session_id: str):
+        """Re-measure a session's memory after a turn and enforce the budget."""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return
+            size = entry.agent.memory_size()
+            self._memory_bytes += size - entry.memory_bytes
+            entry.memory_bytes = size
+            entry.last_used = time.monotonic()
+            self._sessions.move_to_end(session_id)
+            self._evict_over_budget()
+
+    def discard(self, session_id: str):
+        """Drop a session from the cache."""
+        with self._lock:
+            self._remove(session_id)
+
+    def stats(self) -> Dict:
+        """Current size and limits."""
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "memory_bytes": self._memory_bytes,
+                "max_memory_bytes": self.max_memory_bytes
+            }
+
+    def _remove(self, session_id: str):
+        entry = self._sessions.pop(session_id, None)
+        if entry is not None:
+            self._memory_bytes -= entry.memory_bytes
+
+    def _evict_expired(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        # Entries are in least-recently-used order
+        while self._sessions:
+            session_id, entry = next(iter(self._sessions.items()))
+            if entry.last_used >= cutoff:
+                break
+            self._remove(session_id)
+            metrics.increment("agent_sessions.expired")
+
+    def _evict_over_budget(self):
+        self._evict_expired()
+        # Always keep the most recently used session
+        while len(self._sessions) > 1 and (
+            len(self._sessions) > self.max_sessions
+            or self._memory_bytes > self.max_memory_bytes
+        ):
+            session_id = next(iter(self._sessions))
+            self._remove(session_id)
+            metrics.increment("agent_sessions.evicted")
+
+
+agent_sessions = AgentSessionStore(
+    max_sessions=settings.agent_session_max,
+    ttl_seconds=settings.agent_session_ttl_seconds,
+    max_memory_bytes=settings.agent_session_max_memory_mb * 1024 * 1024
+)
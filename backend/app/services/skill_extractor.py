@@ -0,0 +1,235 @@
+from collections import deque
+from typing import Dict, List, Optional, Set
+import json
+import threading
+from app.config import settings
+
+# Canonical skill -> aliases matched in resume text (case-insensitive).
+# Overridden by the JSON file at settings.skill_taxonomy_path.
+DEFAULT_SKILL_TAXONOMY: Dict[str, List[str]] = {
+    "python": ["python"],
+    "java": ["java"],
+    "javascript": ["javascript", "java script", "js", "ecmascript"],
+    "typescript": ["typescript"],
+    "go": ["go", "golang"],
+    "rust": ["rust"],
+    "c++": ["c++", "cpp"],
+    "c#": ["c#", "csharp", "c sharp"],
+    "ruby": ["ruby"],
+    "php": ["php"],
+    "kotlin": ["kotlin"],
+    "swift": ["swift"],
+    "scala": ["scala"],
+    "sql": ["sql"],
+    "postgresql": ["postgresql", "postgres"],
+    "mysql": ["mysql"],
+    "mongodb": ["mongodb", "mongo"],
+    "redis": ["redis"],
+    "elasticsearch": ["elasticsearch", "elastic search"],
+    "kafka": ["kafka", "apache kafka"],
+    "spark": ["spark", "apache spark", "pyspark"],
+    "hadoop": ["hadoop"],
+    "airflow": ["airflow", "apache airflow"],
+    "react": ["react", "react.js", "reactjs"],
+    "angular": ["angular", "angularjs"],
+    "vue": ["vue", "vue.js", "vuejs"],
+    "node.js": ["node.js", "nodejs"],
+    "django": ["django"],
+    "flask": ["flask"],
+    "fastapi": ["fastapi"],
+    "spring": ["spring", "spring boot", "spring framework"],
+    "graphql": ["graphql"],
+    "rest": ["rest", "restful", "rest api", "rest apis"],
+    "docker": ["docker"],
+    "kubernetes": ["kubernetes", "k8s"],
+    "terraform": ["terraform"],
+    "ansible": ["ansible"],
+    "aws": ["aws", "amazon web services"],
+    "gcp": ["gcp", "google cloud", "google cloud platform"],
+    "azure": ["azure", "microsoft azure"],
+    "linux": ["linux"],
+    "git": ["git"],
+    "ci/cd": ["ci/cd", "continuous integration", "continuous delivery", "continuous deployment"],
+    "jenkins": ["jenkins"],
+    "machine learning": ["machine learning", "ml"],
+    "deep learning": ["deep learning"],
+    "nlp": ["nlp", "natural language processing"],
+    "computer vision": ["computer vision"],
+    "tensorflow": ["tensorflow"],
+    "pytorch": ["pytorch"],
+    "scikit-learn": ["scikit-learn", "sklearn", "scikit learn"],
+    "pandas": ["pandas"],
+    "numpy": ["numpy"],
+    "llm": ["llm", "llms", "large language models"],
+    "langchain": ["langchain"],
+    "data analysis": ["data analysis", "data analytics"],
+    "tableau": ["tableau"],
+    "power bi": ["power bi", "powerbi"],
+    "excel": ["excel", "microsoft excel", "ms excel"],
+    "agile": ["agile", "scrum"],
+    "project management": ["project management"],
+    "product management": ["product management"],
+    "figma": ["figma"],
+    "salesforce": ["salesforce"],
+}
+
+# Aliases that are also common English words, with the spellings accepted
+# as the skill. They only count when written that way and used as a name:
+# inside a sentence or in a list, not as a capitalized first word
+# ("Spring 2021 intern", "Excel at ...").
+AMBIGUOUS_ALIASES: Dict[str, List[str]] = {
+    "go": ["Go", "GO"],
+    "rest": ["REST"],
+    "spring": ["Spring", "SPRING"],
+    "excel": ["Excel", "EXCEL"],
+}
+
+# Characters around a term that mark it as an item in a list
+_LIST_SEPARATORS = ",;/|()[]:•·"
+_SENTENCE_ENDS = ".!?\n"
+
+
+def _is_word_char(char: str) -> bool:
+    # "+" and "#" are part of names like c++ and c#
+    return char.isalnum() or char in "+#"
+
+
+class SkillExtractor:
+    """
+    Aho-Corasick automaton over a skill taxonomy.
+
+    The automaton is built once from every alias; extract() then finds all
+    aliases in a text in a single pass, however many skills the taxonomy
+    has. Matches must start and end on word boundaries, so "java" is not
+    found in "javascript". Only listed aliases are matched; a canonical
+    name is not an alias unless it is listed. Ambiguous aliases must also
+    pass _is_skill_usage().
+    """
+
+    def __init__(self, taxonomy: Dict[str, List[str]], ambiguous: Optional[Dict[str, List[str]]] = None):
+        self.taxonomy = taxonomy
+        self._aliases: Dict[str, str] = {}  # alias -> canonical skill
+        for skill, aliases in taxonomy.items():
+            for alias in aliases:
+                self._aliases[alias.lower()] = skill.lower()
+        self._canonical = {skill.lower() for skill in taxonomy}
+        # alias -> spellings accepted as the skill
+        self._ambiguous = {
+            alias.lower(): set(spellings)
+            for alias, spellings in (AMBIGUOUS_ALIASES if ambiguous is None else ambiguous).items()
+        }
+
+        # Trie: per-node transitions, failure links and matched aliases
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+        for alias in self._aliases:
+            self._add(alias)
+        self._link()
+
+    def _add(self, alias: str):
+        node = 0
+        for char in alias:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[node][char] = next_node
+            node = next_node
+        self._output[node].append(alias)
+
+    def _link(self):
+        """Compute failure links breadth-first."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                link = self._goto[fallback].get(char, 0)
+                self._fail[child] = link if link != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def extract(self, text: str) -> List[str]:
+        """
+        Find the canonical skills mentioned in text.
+
+        Args:
+            text: Resume text
+
+        Returns:
+            Sorted list of canonical skill names
+        """
+        if not text:
+            return []
+        original = text
+        text = text.lower()
+        if len(text) != len(original):
+            # Lowercasing changed offsets; ambiguous aliases then never match
+            original = text
+        found: Set[str] = set()
+        node = 0
+        for end, char in enumerate(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for alias in self._output[node]:
+                start = end - len(alias) + 1
+                before = text[start - 1] if start > 0 else " "
+                after = text[end + 1] if end + 1 < len(text) else " "
+                if _is_word_char(before) or _is_word_char(after):
+                    continue
+                if alias in self._ambiguous and not self._is_skill_usage(original, start, end + 1, alias):
+                    continue
+                found.add(self._aliases[alias])
+        return sorted(found)
+
+    def _is_skill_usage(self, text: str, start: int, end: int, alias: str) -> bool:
+        """Whether an ambiguous alias at text[start:end] names the skill rather than the word."""
+        if text[start:end] not in self._ambiguous[alias]:
+            return False
+        before = text[:start].rstrip(" \t")
+        after = text[end:].lstrip(" \t")
+        if (before and before[-1] in _LIST_SEPARATORS) or (after and after[0] in _LIST_SEPARATORS):
+            return True
+        # A capitalized first word is just the start of a sentence
+        return bool(before) and before[-1] not in _SENTENCE_ENDS
+
+    def normalize(self, skill: str) -> str:
+        """Map a skill name or alias to its canonical name."""
+        key = " ".join(skill.lower().split())
+        if key in self._canonical:
+            return key
+        return self._aliases.get(key, key)
+
+
+def load_skill_taxonomy(path: Optional[str] = None) -> Dict[str, List[str]]:
+    """Load the taxonomy JSON at path, or the built-in one when no path is set."""
+    path = path or settings.skill_taxonomy_path
+    if not path:
+        return DEFAULT_SKILL_TAXONOMY
+    with open(path) as f:
+        return json.load(f)
+
+
+_extractor: Optional[SkillExtractor] = None
+_extractor_lock = threading.Lock()
+
+
+def get_skill_extractor() -> SkillExtractor:
+    """Get the process-wide extractor, building the automaton on first use."""
+    global _extractor
+    if _extractor is None:
+        with _extractor_lock:
+            if _extractor is None:
+                _extractor = SkillExtractor(load_skill_taxonomy())
+    return _extractor
+
+
+def extract_skills(text: str) -> List[str]:
+    """Canonical skills mentioned in text."""
+    return get_skill_extractor().extract(text)
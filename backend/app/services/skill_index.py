@@ -0,0 +1,129 @@
+from collections import defaultdict
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, selectinload
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.models.database import Candidate, CandidateSkill, Evaluation
+from app.services.skill_extractor import extract_skills, get_skill_extractor
+
+
+def index_candidate_skills(db: Session, candidates: Iterable[Tuple[Candidate, List[str]]]):
+    """
+    Replace the stored skills of candidates. The caller commits.
+
+    Args:
+        db: Database session
+        candidates: (candidate, canonical skills) pairs; candidates must
+            already have IDs
+    """
+    candidates = list(candidates)
+    if not candidates:
+        return
+
+    db.query(CandidateSkill).filter(
+        CandidateSkill.candidate_id.in_([candidate.id for candidate, _ in candidates])
+    ).delete(synchronize_session=False)
+    db.add_all([
+        CandidateSkill(candidate_id=candidate.id, job_id=candidate.job_id, skill=skill)
+        for candidate, skills in candidates
+        for skill in set(skills or [])
+    ])
+
+
+def reindex_job_skills(db: Session, job_id: int) -> int:
+    """
+    Re-extract skills for every candidate of a job, e.g. after the
+    taxonomy changed or for resumes uploaded before skill indexing.
+    The caller commits.
+
+    Returns:
+        Number of candidates indexed
+    """
+    candidates = db.query(Candidate).options(
+        selectinload(Candidate.resume)
+    ).filter(Candidate.job_id == job_id).all()
+    index_candidate_skills(db, [
+        (candidate, extract_skills(candidate.resume_text or ""))
+        for candidate in candidates
+    ])
+    return len(candidates)
+
+
+def filter_candidates(
+    db: Session,
+    job_id: int,
+    skills: Optional[List[str]] = None,
+    min_score: Optional[float] = None,
+    limit: int = 50
+) -> Tuple[List[str], List[Dict]]:
+    """
+    Find a job's candidates having all of the given skills and at least a
+    minimum overall evaluation score.
+
+    Skills are matched through the (job_id, skill) index; names and aliases
+    are mapped to the taxonomy's canonical names first.
+
+    Args:
+        db: Database session
+        job_id: Job to filter candidates for
+        skills: Required skills
+        min_score: Minimum overall score (0-100); candidates without an
+            evaluation are excluded when set
+        limit: Maximum number of candidates returned
+
+    Returns:
+        Tuple of (canonical skills filtered on, matching candidates best
+        scored first, each with candidate_id, name, email, overall_score,
+        recommendation and skills)
+    """
+    extractor = get_skill_extractor()
+    required = sorted({extractor.normalize(skill) for skill in skills or [] if skill.strip()})
+
+    query = db.query(
+        Candidate.id,
+        Candidate.name,
+        Candidate.email,
+        Evaluation.overall_score,
+        Evaluation.recommendation
+    ).outerjoin(
+        Evaluation, Evaluation.candidate_id == Candidate.id
+    ).filter(
+        Candidate.job_id == job_id
+    )
+
+    if required:
+        having_all = select(CandidateSkill.candidate_id).where(
+            CandidateSkill.job_id == job_id,
+            CandidateSkill.skill.in_(required)
+        ).group_by(
+            CandidateSkill.candidate_id
+        ).having(
+            func.count(CandidateSkill.skill) == len(required)
+        )
+        query = query.filter(Candidate.id.in_(having_all))
+
+    if min_score is not None:
+        query = query.filter(Evaluation.overall_score >= min_score)
+
+    rows = query.order_by(
+        Evaluation.overall_score.desc().nullslast(),
+        Candidate.id
+    ).limit(limit).all()
+
+    skills_by_candidate = defaultdict(list)
+    if rows:
+        for candidate_id, skill in db.query(CandidateSkill.candidate_id, CandidateSkill.skill).filter(
+            CandidateSkill.candidate_id.in_([row.id for row in rows])
+        ).order_by(CandidateSkill.skill):
+            skills_by_candidate[candidate_id].append(skill)
+
+    return required, [
+        {
+            "candidate_id": row.id,
+            "name": row.name,
+            "email": row.email,
+            "overall_score": row.overall_score,
+            "recommendation": row.recommendation,
+            "skills": skills_by_candidate[row.id]
+        }
+        for row in rows
+    ]
@@ -0,0 +1,81 @@
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+import json
+import sys
+import threading
+import time
+from app.services.metrics import metrics
+
+
+def normalize_arguments(arguments: Dict[str, Any]) -> str:
+    """
+    Canonical form of tool arguments used as a memo key.
+
+    Strings are trimmed, lowercased and whitespace-collapsed, lists are
+    sorted and None values dropped, so calls that differ only in spelling
+    or argument order share an entry.
+    """
+    def normalize(value):
+        if isinstance(value, str):
+            return " ".join(value.lower().split())
+        if isinstance(value, (list, tuple, set)):
+            return sorted((normalize(item) for item in value), key=json.dumps)
+        if isinstance(value, dict):
+            return {key: normalize(item) for key, item in value.items() if item is not None}
+        return value
+
+    return json.dumps(normalize(arguments), sort_keys=True, default=str)
+
+
+class ToolMemo:
+    """
+    Per-session cache of agent tool results.
+
+    Entries are keyed on the tool name and normalized arguments and expire
+    after ttl_seconds, so repeated searches, lookups and evaluations within
+    and across a session's turns are answered without repeating embedding,
+    vector store or GPT-4 calls.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()  # key -> (stored_at, result)
+
+    def get(self, tool_name: str, arguments: Dict[str, Any]) -> Optional[str]:
+        """Get a fresh cached result, or None."""
+        key = (tool_name, normalize_arguments(arguments))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+                self._entries.pop(key, None)
+                metrics.increment("agent_tools.memo_misses")
+                return None
+            self._entries.move_to_end(key)
+        metrics.increment("agent_tools.memo_hits")
+        return entry[1]
+
+    def put(self, tool_name: str, arguments: Dict[str, Any], result: str):
+        """Cache a tool result."""
+        key = (tool_name, normalize_arguments(arguments))
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def size(self) -> int:
+        """Approximate bytes held by cached results."""
+        with self._lock:
+            return sum(sys.getsizeof(result) for _, result in self._entries.values())
+
+
+# Memo of the session whose agent run is executing; set by HRAgent around
+# each run and inherited by tools running in worker threads
+current_tool_memo: ContextVar[Optional[ToolMemo]] = ContextVar("current_tool_memo", default=None)
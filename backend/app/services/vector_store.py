@@ -0,0 +1,317 @@
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Iterator, List, Dict, Optional, Tuple
+import json
+import os
+import threading
+import numpy as np
+from app.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: file locks are unavailable, run a single worker
+    fcntl = None
+
+# Dimension of text-embedding-3-small vectors
+EMBEDDING_DIMENSION = 1536
+
+
+class VectorStore(ABC):
+    """
+    Storage and similarity search for resume vectors.
+
+    Vectors are grouped into namespaces (one per job). Scores are cosine
+    similarities, higher is better.
+    """
+
+    @abstractmethod
+    def upsert(self, namespace: str, vectors: List[Dict]):
+        """Insert or replace vectors given as dicts with id, values and metadata."""
+
+    @abstractmethod
+    def query(self, namespace: str, vector: List[float], top_k: int, filter: Optional[Dict] = None) -> List[Dict]:
+        """Return up to top_k dicts with id, score and metadata, best first."""
+
+    @abstractmethod
+    def delete(self, namespace: str, ids: List[str]):
+        """Delete vectors by ID."""
+
+
+class PineconeVectorStore(VectorStore):
+    """Vector store backed by a Pinecone serverless index."""
+
+    def __init__(self, api_key: str, index_name: str):
+        from pinecone import Pinecone
+
+        self.pc = Pinecone(api_key=api_key)
+        self.index_name = index_name
+        self._ensure_index()
+        self.index = self.pc.Index(self.index_name)
+
+    def _ensure_index(self):
+        """Ensure Pinecone index exists, create if not."""
+        try:
+            # Check if index exists
+            existing_indexes = [idx.name for idx in self.pc.list_indexes()]
+            if self.index_name not in existing_indexes:
+                # Create index with dimension 1536 (text-embedding-3-small)
+                self.pc.create_index(
+                    name=self.index_name,
+                    dimension=EMBEDDING_DIMENSION,
+                    metric="cosine"
+                )
+        except Exception as e:
+            print(f"Warning: Could not ensure index exists: {e}")
+
+    def upsert(self, namespace: str, vectors: List[Dict]):
+        self.index.upsert(vectors=vectors, namespace=namespace)
+
+    def query(self, namespace: str, vector: List[float], top_k: int, filter: Optional[Dict] = None) -> List[Dict]:
+        results = self.index.query(
+            vector=vector,
+            top_k=top_k,
+            include_metadata=True,
+            namespace=namespace,
+            filter=filter
+        )
+        return [
+            {"id": match.id, "score": match.score, "metadata": match.metadata or {}}
+            for match in results.matches
+        ]
+
+    def delete(self, namespace: str, ids: List[str]):
+        self.index.delete(ids=ids, namespace=namespace)
+
+
+class _LocalNamespace:
+    """Vectors, per-row scales and metadata of one local namespace."""
+
+    def __init__(
+        self,
+        ids: List[str],
+        metadata: List[Dict],
+        vectors: np.ndarray,
+        scales: Optional[np.ndarray],
+        stamp: Optional[Tuple[int, int, int]] = None
+    ):
+        self.ids = ids
+        self.metadata = metadata
+        self.vectors = vectors
+        self.scales = scales
+        self.stamp = stamp  # Identity of the index.json it was loaded from
+
+
+class LocalVectorStore(VectorStore):
+    """
+    In-process brute-force vector store persisted to memory-mapped files.
+
+    Each namespace is a directory holding a normalized (n, dim) matrix in
+    vectors.npy plus ids and metadata in index.json. A query is a single
+    matrix-vector product over the namespace, with no network round trip.
+
+    Vectors can be stored as float32, float16 (half the size) or int8
+    (a quarter, with a per-row scale in scales.npy).
+
+    Several worker processes can share the directory: writes hold an
+    exclusive file lock on the namespace for the whole read-modify-write,
+    reads a shared one, and a cached namespace is reloaded when another
+    process has replaced its index.json.
+    """
+
+    DTYPES = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+
+    def __init__(self, directory: str, dtype: str = "float32"):
+        if dtype not in self.DTYPES:
+            raise ValueError(f"Unsupported vector dtype: {dtype}")
+        self.directory = directory
+        self.dtype = dtype
+        self._lock = threading.Lock()
+        self._namespaces: Dict[str, _LocalNamespace] = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def upsert(self, namespace: str, vectors: List[Dict]):
+        if not vectors:
+            return
+        with self._lock, self._file_lock(namespace, exclusive=True):
+            current = self._load(namespace)
+            incoming = {vector["id"] for vector in vectors}
+            keep = [i for i, vector_id in enumerate(current.ids) if vector_id not in incoming]
+
+            values = self._normalize(np.asarray([vector["values"] for vector in vectors], dtype=np.float32))
+            old_values = self._dequantize(current, keep)
+
+            self._save(
+                namespace,
+                ids=[current.ids[i] for i in keep] + [vector["id"] for vector in vectors],
+                metadata=[current.metadata[i] for i in keep] + [vector.get("metadata") or {} for vector in vectors],
+                values=np.concatenate([old_values, values]) if len(keep) else values
+            )
+
+    def query(self, namespace: str, vector: List[float], top_k: int, filter: Optional[Dict] = None) -> List[Dict]:
+        with self._lock, self._file_lock(namespace, exclusive=False):
+            current = self._load(namespace)
+        if not current.ids:
+            return []
+
+        rows = np.arange(len(current.ids))
+        vectors, scales = current.vectors, current.scales
+        if filter:
+            rows = rows[[self._matches_filter(current.metadata[i], filter) for i in rows]]
+            if not len(rows):
+                return []
+            vectors = vectors[rows]
+            scales = scales[rows] if scales is not None else None
+
+        query_vector = self._normalize(np.asarray([vector], dtype=np.float32))[0]
+        scores = np.asarray(vectors @ query_vector, dtype=np.float32)
+        if scales is not None:
+            scores = scores * scales
+
+        k = min(top_k, len(rows))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+
+        return [
+            {
+                "id": current.ids[rows[i]],
+                "score": float(scores[i]),
+                "metadata": current.metadata[rows[i]]
+            }
+            for i in best
+        ]
+
+    def delete(self, namespace: str, ids: List[str]):
+        with self._lock, self._file_lock(namespace, exclusive=True):
+            current = self._load(namespace)
+            removed = set(ids)
+            keep = [i for i, vector_id in enumerate(current.ids) if vector_id not in removed]
+            if len(keep) == len(current.ids):
+                return
+
+            self._save(
+                namespace,
+                ids=[current.ids[i] for i in keep],
+                metadata=[current.metadata[i] for i in keep],
+                values=self._dequantize(current, keep)
+            )
+
+    def _namespace_dir(self, namespace: str) -> str:
+        return os.path.join(self.directory, namespace or "_default")
+
+    @contextmanager
+    def _file_lock(self, namespace: str, exclusive: bool) -> Iterator[None]:
+        """Lock a namespace against other processes sharing the directory."""
+        path = self._namespace_dir(namespace)
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, ".lock"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            # Closing the file releases the lock
+            yield
+
+    def _load(self, namespace: str) -> _LocalNamespace:
+        """
+        Get a namespace, memory-mapping it from disk on first access.
+
+        index.json is replaced last on every write, so a changed inode,
+        mtime or size means another process wrote the namespace. Callers
+        hold the namespace's file lock.
+        """
+        path = self._namespace_dir(namespace)
+        index_path = os.path.join(path, "index.json")
+        try:
+            stat = os.stat(index_path)
+            stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            stamp = None
+
+        cached = self._namespaces.get(namespace)
+        if cached is not None and cached.stamp == stamp:
+            return cached
+
+        if stamp is not None:
+            with open(index_path) as f:
+                index = json.load(f)
+            vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+            scales_path = os.path.join(path, "scales.npy")
+            scales = np.load(scales_path, mmap_mode="r") if os.path.exists(scales_path) else None
+            loaded = _LocalNamespace(index["ids"], index["metadata"], vectors, scales, stamp)
+        else:
+            loaded = _LocalNamespace([], [], np.zeros((0, EMBEDDING_DIMENSION), dtype=np.float32), None)
+
+        self._namespaces[namespace] = loaded
+        return loaded
+
+    def _save(self, namespace: str, ids: List[str], metadata: List[Dict], values: np.ndarray):
+        """Write a namespace to disk, replacing the previous files atomically."""
+        path = self._namespace_dir(namespace)
+        os.makedirs(path, exist_ok=True)
+
+        vectors, scales = self._quantize(values)
+        files = {"vectors.npy": vectors}
+        if scales is not None:
+            files["scales.npy"] = scales
+
+        for name, array in files.items():
+            tmp_path = os.path.join(path, f".{name}.tmp")
+            with open(tmp_path, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp_path, os.path.join(path, name))
+        if scales is None and os.path.exists(os.path.join(path, "scales.npy")):
+            os.remove(os.path.join(path, "scales.npy"))
+
+        tmp_index = os.path.join(path, ".index.json.tmp")
+        with open(tmp_index, "w") as f:
+            json.dump({"dtype": self.dtype, "ids": ids, "metadata": metadata}, f)
+        os.replace(tmp_index, os.path.join(path, "index.json"))
+
+        # Drop the cached memmap so the next access maps the new files
+        self._namespaces.pop(namespace, None)
+
+    def _quantize(self, values: np.ndarray):
+        if self.dtype == "int8":
+            scales = np.abs(values).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            quantized = np.round(values / scales[:, None]).astype(np.int8)
+            return quantized, scales.astype(np.float32)
+        return values.astype(self.DTYPES[self.dtype]), None
+
+    def _dequantize(self, current: _LocalNamespace, rows) -> np.ndarray:
+        values = np.asarray(current.vectors[rows], dtype=np.float32)
+        if current.scales is not None:
+            values *= np.asarray(current.scales[rows])[:, None]
+        return values
+
+    @staticmethod
+    def _normalize(values: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(values, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return values / norms
+
+    @staticmethod
+    def _matches_filter(metadata: Dict, filter: Dict) -> bool:
+        """Evaluate a Pinecone-style equality filter against metadata."""
+        for key, condition in filter.items():
+            if isinstance(condition, dict):
+                if "$eq" in condition and metadata.get(key) != condition["$eq"]:
+                    return False
+                if "$in" in condition and metadata.get(key) not in condition["$in"]:
+                    return False
+            elif metadata.get(key) != condition:
+                return False
+        return True
+
+
+def create_vector_store() -> VectorStore:
+    """Build the vector store selected by settings.vector_store_backend."""
+    if settings.vector_store_backend == "local":
+        return LocalVectorStore(
+            directory=settings.local_vector_store_dir,
+            dtype=settings.local_vector_store_dtype
+        )
+    if settings.vector_store_backend == "pinecone":
+        return PineconeVectorStore(
+            api_key=settings.pinecone_api_key,
+            index_name=settings.pinecone_index_name
+        )
+    raise ValueError(f"Unknown vector store backend: {settings.vector_store_backend}")
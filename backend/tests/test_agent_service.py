@@ -0,0 +1,50 @@
+"""Agent sessions against the pinned LangChain versions, with a fake LLM."""
+import asyncio
+import pytest
+from langchain_community.chat_models.fake import FakeListChatModel
+
+from app.services import agent_service
+from app.services.agent_service import AgentRuntime, HRAgent
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    # Every LLM call (agent steps and summaries) answers with the same text
+    monkeypatch.setattr(
+        agent_service,
+        "ChatOpenAI",
+        lambda **kwargs: FakeListChatModel(responses=["Here is my answer."])
+    )
+    monkeypatch.setattr(agent_service.intent_router, "route", lambda message, job_id: None)
+    return HRAgent(job_id=1, runtime=AgentRuntime())
+
+
+def test_achat_saves_turn_to_memory(agent):
+    result = asyncio.run(agent.achat("Hello"))
+
+    assert result["success"], result.get("error")
+    assert result["response"] == "Here is my answer."
+    messages = agent.memory.load_memory_variables({})["chat_history"]
+    assert [message.content for message in messages] == ["[Job ID: 1] Hello", "Here is my answer."]
+
+
+def test_achat_fast_path_saves_turn_to_memory(agent, monkeypatch):
+    monkeypatch.setattr(
+        agent_service.intent_router,
+        "route",
+        lambda message, job_id: {"intent": "top_candidates", "arguments": {"job_id": 1}, "response": "No evaluations yet."}
+    )
+
+    result = asyncio.run(agent.achat("top 5 candidates for job 1"))
+
+    assert result["success"], result.get("error")
+    assert result["response"] == "No evaluations yet."
+    assert len(agent.memory.load_memory_variables({})["chat_history"]) == 2
+
+
+def test_system_prompt_lists_registered_tools(agent):
+    system_prompt = agent.runtime.prompt.messages[0].prompt.template
+    tool_section = system_prompt.split("**Tool Usage**")[1].split("4. **")[0]
+    listed = [line.split(":")[0].strip(" -") for line in tool_section.splitlines() if line.startswith("   - ")]
+
+    assert listed == [tool.name for tool in agent.runtime.tools]
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.database import Base, Candidate, Job
+from app.services import agent_tools
+from app.services.agent_tools import _observation, create_agent_tools
+
+
+def test_long_field_is_truncated_before_list_items():
+    payload = {
+        "job_id": 1,
+        "description": "x" * 5000,
+        "candidates": [{"id": i, "name": f"Candidate {i}"} for i in range(10)]
+    }
+    encoded = _observation(payload, max_tokens=250)
+    result = json.loads(encoded)
+    
+    assert len(encoded) <= 1000
+    assert result["candidates"] == payload["candidates"]
+    assert "candidates_omitted" not in result
+    assert result["description"].endswith("...[truncated]")
+
+
+def test_list_is_cut_to_fit_after_strings():
+    payload = {
+        "description": "x" * 5000,
+        "candidates": [{"id": i, "name": f"Candidate {i}"} for i in range(100)]
+    }
+    encoded = _observation(payload, max_tokens=250)
+    result = json.loads(encoded)
+    
+    assert len(encoded) <= 1000
+    assert result["candidates"] == payload["candidates"][:len(result["candidates"])]
+    assert result["candidates_omitted"] == 100 - len(result["candidates"])
+
+
+def test_small_result_is_unchanged():
+    payload = {"job_id": 1, "candidates": [{"id": 1}]}
+    assert json.loads(_observation(payload, max_tokens=250)) == payload
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def test_evaluate_candidate_against_another_job(session_factory, monkeypatch):
+    with session_factory() as db:
+        own_job = Job(title="Backend", description="Python services")
+        other_job = Job(title="Data", description="Spark pipelines")
+        db.add_all([own_job, other_job])
+        db.flush()
+        candidate = Candidate(job_id=own_job.id, name="Ada", resume_text="Python and Spark")
+        db.add(candidate)
+        db.commit()
+        candidate_id, other_job_id = candidate.id, other_job.id
+    
+    evaluated = []
+    
+    def fake_evaluate(job_description, resume_text):
+        evaluated.append((job_description, resume_text))
+        return {
+            "overall_score": 80.0,
+            "technical_score": 85.0,
+            "experience_score": 75.0,
+            "education_score": 70.0,
+            "strengths": ["Spark"],
+            "concerns": [],
+            "recommendation": "Interview",
+            "ai_analysis": "Good fit"
+        }
+    
+    monkeypatch.setattr(agent_tools.generation, "evaluate_candidate", fake_evaluate)
+    tools = {tool.name: tool for tool in create_agent_tools(session_factory)}
+    
+    result = json.loads(tools["evaluate_candidate_db"].func(candidate_id=candidate_id, job_id=other_job_id))
+    
+    assert evaluated == [("Spark pipelines", "Python and Spark")]
+    assert result["job_id"] == other_job_id
+    assert result["name"] == "Ada"
+    assert result["overall_score"] == 80.0
@@ -0,0 +1,277 @@
+"""
+Query-plan regression tests for the API's hot paths.
+
+Builds the schema with the Alembic migrations in an empty Postgres
+database, loads enough rows that the planner has to use indexes, calls
+each route and EXPLAINs every SELECT, UPDATE and DELETE it issued. A
+sequential scan on one of the large tables fails the test.
+
+The database at TEST_DATABASE_URL is wiped; the tests are skipped when
+it is not set:
+
+    TEST_DATABASE_URL=postgresql://localhost/hr_agent_test pytest tests
+"""
+import asyncio
+import json
+import os
+import pytest
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+if not TEST_DATABASE_URL:
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+
+# Settings are read at import time, so point the app at the test database first
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("SECRET_KEY", "test")
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import event, text
+from app.models.database import Base
+from app.services.db_service import engine, async_engine, AsyncSessionLocal
+from app.services import evaluation_runner
+from app.api.routes import chat, jobs
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Data volume; large enough that a sequential scan is never the cheapest plan
+JOBS = 2000
+CANDIDATES_PER_JOB = 10
+CHAT_SESSIONS = 5000
+MESSAGES_PER_SESSION = 20
+SKILLS = ["python", "go", "kubernetes", "sql", "react"]
+
+# Tables that must never be read with a sequential scan
+LARGE_TABLES = {
+    "jobs",
+    "candidates",
+    "evaluations",
+    "candidate_skills",
+    "evaluation_runs",
+    "chat_sessions",
+    "chat_messages",
+}
+
+SEED_SQL = [
+    """
+    INSERT INTO jobs (id, title, description, created_at)
+    SELECT g, 'Job ' || g, 'Description of job ' || g, now()
+    FROM generate_series(1, :jobs) g
+    """,
+    """
+    INSERT INTO candidates (id, job_id, name, email, pinecone_id, created_at)
+    SELECT g, (g - 1) / :per_job + 1, 'Candidate ' || g, 'candidate' || g || '@example.com',
+           'candidate_' || g, now()
+    FROM generate_series(1, :candidates) g
+    """,
+    """
+    INSERT INTO evaluations (candidate_id, overall_score, technical_score, experience_score,
+                             education_score, strengths, concerns, recommendation, ai_analysis, created_at)
+    SELECT g, random() * 100, random() * 100, random() * 100, random() * 100,
+           '[]', '[]', 'Consider', '', now()
+    FROM generate_series(1, :candidates) g
+    """,
+    """
+    INSERT INTO candidate_skills (candidate_id, skill, job_id)
+    SELECT c.id, s.skill, c.job_id
+    FROM candidates c CROSS JOIN unnest(CAST(:skills AS varchar[])) AS s(skill)
+    WHERE (c.id + length(s.skill)) % 2 = 0
+    """,
+    """
+    INSERT INTO evaluation_runs (job_id, status, total_candidates, evaluated_count, failed_count, created_at)
+    SELECT g, 'completed', :per_job, :per_job, 0, now() - interval '1 hour'
+    FROM generate_series(1, :jobs) g
+    """,
+    """
+    INSERT INTO chat_sessions (id, session_id, job_id, created_at, updated_at)
+    SELECT g, 'session-' || g, g % :jobs + 1, now(), now() - g * interval '1 second'
+    FROM generate_series(1, :sessions) g
+    """,
+    """
+    INSERT INTO chat_messages (session_id, role, content, reasoning, tools_used, created_at)
+    SELECT 'session-' || s, CASE WHEN m % 2 = 1 THEN 'user' ELSE 'agent' END, 'Message ' || m,
+           '[]', '[]', now() - (s * 100 + m) * interval '1 second'
+    FROM generate_series(1, :sessions) s, generate_series(1, :per_session) m
+    """,
+]
+
+
+def _alembic_config() -> Config:
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    return config
+
+
+@pytest.fixture(scope="module")
+def run():
+    """Run a coroutine on the event loop shared by the module's tests."""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.run_until_complete(async_engine.dispose())
+    loop.close()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def database():
+    """Migrate an empty schema and load it with data."""
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+
+    command.upgrade(_alembic_config(), "head")
+
+    with engine.begin() as conn:
+        params = {
+            "jobs": JOBS,
+            "per_job": CANDIDATES_PER_JOB,
+            "candidates": JOBS * CANDIDATES_PER_JOB,
+            "skills": SKILLS,
+            "sessions": CHAT_SESSIONS,
+            "per_session": MESSAGES_PER_SESSION,
+        }
+        for statement in SEED_SQL:
+            conn.execute(text(statement), params)
+        for table in ("jobs", "candidates", "chat_sessions"):
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"
+            ))
+        conn.execute(text("ANALYZE"))
+
+    yield
+
+    command.downgrade(_alembic_config(), "base")
+
+
+@pytest.fixture
+def db(run):
+    session = AsyncSessionLocal()
+    yield session
+    run(session.close())
+
+
+@pytest.fixture
+def captured():
+    """Statements (with parameters) that read rows, issued by the routes while the test runs."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            # One parameter set is enough to plan a batched statement
+            statements.append((statement, parameters[0] if executemany else parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+
+def _plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+async def _explain(statements):
+    """JSON plans of statements, run through the driver the routes use."""
+    plans = []
+    async with async_engine.connect() as conn:
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters)
+            plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            plans.append(plan[0]["Plan"])
+    return plans
+
+
+def assert_no_seq_scans(run, statements):
+    """EXPLAIN each statement and fail on sequential scans of large tables."""
+    assert statements, "No queries were captured"
+    for (statement, _), plan in zip(statements, run(_explain(list(statements)))):
+        seq_scans = [
+            node["Relation Name"]
+            for node in _plan_nodes(plan)
+            if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in LARGE_TABLES
+        ]
+        assert not seq_scans, f"Sequential scan on {seq_scans} for:\n{statement}"
+
+
+def test_migrations_match_models():
+    with engine.connect() as conn:
+        differences = compare_metadata(MigrationContext.configure(conn), Base.metadata)
+    assert differences == []
+
+
+def test_top_candidates(run, db, captured):
+    response = run(jobs.get_top_candidates(job_id=JOBS // 2, db=db))
+    assert len(response["top_5"]) == 5
+    assert_no_seq_scans(run, captured)
+
+
+def test_latest_evaluation_run(run, db, captured):
+    run(jobs.get_latest_evaluation_run(job_id=JOBS // 2, db=db))
+    assert_no_seq_scans(run, captured)
+
+
+def test_filter_candidates_by_skills_and_score(run, db, captured):
+    run(jobs.search_job_candidates(job_id=JOBS // 2, skills="python,sql", min_score=10, limit=50, db=db))
+    assert_no_seq_scans(run, captured)
+
+
+def test_list_chat_sessions(run, db, captured):
+    first = run(chat.list_chat_sessions(job_id=None, cursor=None, limit=50, db=db))
+    assert len(first.sessions) == 50
+    run(chat.list_chat_sessions(job_id=None, cursor=first.next_cursor, limit=50, db=db))
+    assert_no_seq_scans(run, captured)
+
+
+def test_list_chat_sessions_for_job(run, db, captured):
+    first = run(chat.list_chat_sessions(job_id=JOBS // 2, cursor=None, limit=1, db=db))
+    run(chat.list_chat_sessions(job_id=JOBS // 2, cursor=first.next_cursor, limit=1, db=db))
+    assert_no_seq_scans(run, captured)
+
+
+def test_chat_history(run, db, captured):
+    session_id = f"session-{CHAT_SESSIONS // 2}"
+    first = run(chat.get_chat_history(session_id, cursor=None, limit=5, include_details=False, db=db))
+    run(chat.get_chat_history(session_id, cursor=first.next_cursor, limit=5, include_details=True, db=db))
+    run(chat.get_chat_message_details(session_id, first.messages[-1].id, db=db))
+    assert_no_seq_scans(run, captured)
+
+
+def test_get_job(run, db, captured):
+    run(jobs.get_job(job_id=JOBS // 2, db=db))
+    assert_no_seq_scans(run, captured)
+
+
+def test_evaluation_run(run, db, captured):
+    # Seeded runs are numbered like their jobs
+    response = run(jobs.get_evaluation_run(job_id=JOBS // 2, run_id=JOBS // 2, db=db))
+    assert response.job_id == JOBS // 2
+    assert_no_seq_scans(run, captured)
+
+
+def test_start_evaluation_run(run, db, captured, monkeypatch):
+    # Only the queries matter; do not run the evaluation
+    monkeypatch.setattr(evaluation_runner._executor, "submit", lambda *args: None)
+    first = run(jobs.evaluate_candidates(job_id=JOBS // 3, db=db))
+    again = run(jobs.evaluate_candidates(job_id=JOBS // 3, db=db))
+    assert again["run_id"] == first["run_id"]
+    assert_no_seq_scans(run, captured)
+
+
+def test_reindex_job(run, db, captured, monkeypatch):
+    def reindex(job_id, candidates):
+        return [f"job_{job_id}:candidate_{candidate['candidate_id']}" for candidate in candidates]
+    
+    monkeypatch.setattr(jobs.retrieval_service, "reindex_job", reindex)
+    response = run(jobs.reindex_job(job_id=JOBS // 4, db=db))
+    assert response["reindexed"] == CANDIDATES_PER_JOB
+    assert_no_seq_scans(run, captured)
+
+
+def test_clear_chat_session(run, db, captured):
+    run(chat.clear_chat_session(f"session-{CHAT_SESSIONS // 3}", db=db))
+    assert_no_seq_scans(run, captured)
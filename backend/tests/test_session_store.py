@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from app.services.session_store import AgentSessionStore
+
+
+class FakeAgent:
+    def memory_size(self) -> int:
+        return 0
+
+
+def make_store() -> AgentSessionStore:
+    return AgentSessionStore(max_sessions=10, ttl_seconds=3600, max_memory_bytes=1024)
+
+
+def test_cached_agent_is_reused_for_the_same_memory_version():
+    store = make_store()
+    first = store.get_or_create("s1", FakeAgent)
+    assert store.get_or_create("s1", FakeAgent) is first
+
+
+def test_agent_is_rebuilt_after_memory_cleared_elsewhere():
+    store = make_store()
+    stale = store.get_or_create("s1", FakeAgent)
+    
+    # Another worker cleared the session's memory
+    rebuilt = store.get_or_create("s1", FakeAgent, memory_version=datetime(2026, 1, 1))
+    assert rebuilt is not stale
+    assert store.get_or_create("s1", FakeAgent, memory_version=datetime(2026, 1, 1)) is rebuilt
+
+
+def test_agent_cleared_in_place_stays_cached():
+    store = make_store()
+    agent = store.get_or_create("s1", FakeAgent)
+    store.set_memory_version("s1", datetime(2026, 1, 1))
+    assert store.get_or_create("s1", FakeAgent, memory_version=datetime(2026, 1, 1)) is agent
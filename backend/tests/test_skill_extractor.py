@@ -0,0 +1,38 @@
+from app.services.skill_extractor import SkillExtractor, DEFAULT_SKILL_TAXONOMY, extract_skills
+
+
+def test_common_words_are_not_skills():
+    text = "Spring 2021 intern. I excel at communication. Took a rest. Let's go."
+    assert extract_skills(text) == []
+
+
+def test_capitalized_sentence_start_is_not_a_skill():
+    assert extract_skills("Excel at leading teams. Go-getter. Rest assured.") == []
+
+
+def test_ambiguous_skills_in_lists_and_sentences():
+    assert extract_skills("Skills: Go, REST, Spring, Excel") == ["excel", "go", "rest", "spring"]
+    assert extract_skills("Built services in Go and Spring with REST endpoints") == ["go", "rest", "spring"]
+    assert extract_skills("Reporting in Excel (pivot tables)") == ["excel"]
+
+
+def test_unambiguous_aliases_match_case_insensitively():
+    assert extract_skills("golang, K8S and rest api design; spring boot") == ["go", "kubernetes", "rest", "spring"]
+
+
+def test_canonical_name_is_not_an_alias_unless_listed():
+    extractor = SkillExtractor({"c++": ["cpp"]})
+    assert extractor.extract("c++ and cpp") == ["c++"]
+    assert extractor.extract("c++") == []
+    assert extractor.normalize("C++") == "c++"
+
+
+def test_word_boundaries():
+    assert extract_skills("javascript") == ["javascript"]
+    assert extract_skills("c++ and c#") == ["c#", "c++"]
+
+
+def test_default_taxonomy_normalizes_aliases():
+    extractor = SkillExtractor(DEFAULT_SKILL_TAXONOMY)
+    assert extractor.normalize("Golang") == "go"
+    assert extractor.normalize("Excel") == "excel"
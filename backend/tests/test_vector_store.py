@@ -0,0 +1,36 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.vector_store import LocalVectorStore
+
+
+def vector(candidate_id: int, values):
+    return {"id": f"candidate_{candidate_id}", "values": values, "metadata": {"candidate_id": candidate_id}}
+
+
+def test_store_sees_writes_from_another_worker(tmp_path):
+    # Two stores over one directory stand in for two worker processes
+    writer = LocalVectorStore(str(tmp_path))
+    reader = LocalVectorStore(str(tmp_path))
+    
+    writer.upsert("job_1", [vector(1, [1.0, 0.0, 0.0])])
+    assert [match["id"] for match in reader.query("job_1", [1.0, 0.0, 0.0], 5)] == ["candidate_1"]
+    
+    # The reader has the namespace cached; it must pick up the new files
+    writer.upsert("job_1", [vector(2, [0.0, 1.0, 0.0])])
+    assert [match["id"] for match in reader.query("job_1", [0.0, 1.0, 0.0], 5)] == ["candidate_2", "candidate_1"]
+    
+    writer.delete("job_1", ["candidate_2"])
+    assert [match["id"] for match in reader.query("job_1", [0.0, 1.0, 0.0], 5)] == ["candidate_1"]
+
+
+def test_concurrent_upserts_from_workers_are_all_kept(tmp_path):
+    stores = [LocalVectorStore(str(tmp_path)) for _ in range(4)]
+    
+    def upsert(candidate_id: int):
+        stores[candidate_id % len(stores)].upsert("job_1", [vector(candidate_id, [1.0, float(candidate_id), 0.0])])
+    
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(upsert, range(40)))
+    
+    matches = LocalVectorStore(str(tmp_path)).query("job_1", [1.0, 0.0, 0.0], 100)
+    assert sorted(match["metadata"]["candidate_id"] for match in matches) == list(range(40))
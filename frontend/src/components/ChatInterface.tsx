@@ -6,7 +6,7 @@ import { Input } from "@/components/ui/input";
 import { Button } from "@/components/ui/button";
 import { ChatMessage } from "./ChatMessage";
 import { chatApi, ChatHistoryMessage, ChatMessageResponse } from "@/lib/api";
-import { Send, Loader2, Sparkles, Trash2, Bot } from "lucide-react";
+import { Send, Loader2, Sparkles, Trash2, Bot, ChevronUp } from "lucide-react";
 
 interface ChatInterfaceProps {
   jobId?: number;
@@ -19,8 +19,14 @@ export function ChatInterface({ jobId, sessionId: initialSessionId }: ChatInterf
   const [loading, setLoading] = useState(false);
   const [sessionId, setSessionId] = useState<string | undefined>(initialSessionId);
   const [thinking, setThinking] = useState(false);
+  const [earlierCursor, setEarlierCursor] = useState<string | null>(null);
+  const [loadingEarlier, setLoadingEarlier] = useState(false);
   const messagesEndRef = useRef<HTMLDivElement>(null);
   const chatContainerRef = useRef<HTMLDivElement>(null);
+  // Scroll height before older messages were prepended, to keep the view in place
+  const prependScrollHeightRef = useRef<number | null>(null);
+  // Messages loaded from history; their reasoning is fetched when expanded
+  const historyIdsRef = useRef<Set<number>>(new Set());
 
   useEffect(() => {
     if (initialSessionId) {
@@ -29,6 +35,12 @@ export function ChatInterface({ jobId, sessionId: initialSessionId }: ChatInterf
   }, [initialSessionId]);
 
   useEffect(() => {
+    const container = chatContainerRef.current;
+    if (prependScrollHeightRef.current !== null && container) {
+      container.scrollTop += container.scrollHeight - prependScrollHeightRef.current;
+      prependScrollHeightRef.current = null;
+      return;
+    }
     scrollToBottom();
   }, [messages]);
 
@@ -38,14 +50,36 @@ export function ChatInterface({ jobId, sessionId: initialSessionId }: ChatInterf
 
   const loadHistory = async (sid: string) => {
     try {
-      const history = await chatApi.getHistory(sid);
+      const history = await chatApi.getHistory(sid, { include_details: false });
+      historyIdsRef.current = new Set(history.messages.map((message) => message.id));
       setMessages(history.messages);
+      setEarlierCursor(history.next_cursor ?? null);
       setSessionId(sid);
     } catch (error) {
       console.error("Error loading chat history:", error);
     }
   };
 
+  const loadEarlier = async () => {
+    if (!sessionId || !earlierCursor || loadingEarlier) return;
+
+    setLoadingEarlier(true);
+    try {
+      const history = await chatApi.getHistory(sessionId, {
+        cursor: earlierCursor,
+        include_details: false,
+      });
+      history.messages.forEach((message) => historyIdsRef.current.add(message.id));
+      prependScrollHeightRef.current = chatContainerRef.current?.scrollHeight ?? null;
+      setMessages((prev) => [...history.messages, ...prev]);
+      setEarlierCursor(history.next_cursor ?? null);
+    } catch (error) {
+      console.error("Error loading earlier messages:", error);
+    } finally {
+      setLoadingEarlier(false);
+    }
+  };
+
   const handleSend = async () => {
     if (!input.trim() || loading) return;
 
@@ -103,6 +137,8 @@ export function ChatInterface({ jobId, sessionId: initialSessionId }: ChatInterf
       }
     }
     setMessages([]);
+    historyIdsRef.current = new Set();
+    setEarlierCursor(null);
     setSessionId(undefined);
   };
 
@@ -156,8 +192,34 @@ export function ChatInterface({ jobId, sessionId: initialSessionId }: ChatInterf
           </div>
         ) : (
           <>
+            {earlierCursor && (
+              <div className="flex justify-center">
+                <Button
+                  variant="ghost"
+                  size="sm"
+                  onClick={loadEarlier}
+                  disabled={loadingEarlier}
+                  className="text-gray-500"
+                >
+                  {loadingEarlier ? (
+                    <Loader2 className="h-4 w-4 mr-2 animate-spin" />
+                  ) : (
+                    <ChevronUp className="h-4 w-4 mr-2" />
+                  )}
+                  Load earlier messages
+                </Button>
+              </div>
+            )}
             {messages.map((message) => (
-              <ChatMessage key={message.id} message={message} />
+              <ChatMessage
+                key={message.id}
+                message={message}
+                loadDetails={
+                  sessionId && historyIdsRef.current.has(message.id)
+                    ? () => chatApi.getMessageDetails(sessionId, message.id)
+                    : undefined
+                }
+              />
             ))}
             {thinking && (
               <div className="flex items-start space-x-3">
@@ -1,17 +1,38 @@
 "use client";
 
 import { Card, CardContent } from "@/components/ui/card";
-import { ChatHistoryMessage, ReasoningStep } from "@/lib/api";
-import { User, Bot, ChevronDown, ChevronUp } from "lucide-react";
+import { ChatHistoryMessage, ChatMessageDetails, ReasoningStep } from "@/lib/api";
+import { User, Bot, ChevronDown, ChevronUp, Loader2 } from "lucide-react";
 import { useState } from "react";
 
 interface ChatMessageProps {
   message: ChatHistoryMessage;
+  // Fetches reasoning and tools for messages loaded from history without them
+  loadDetails?: () => Promise<ChatMessageDetails>;
 }
 
-export function ChatMessage({ message }: ChatMessageProps) {
+export function ChatMessage({ message, loadDetails }: ChatMessageProps) {
   const [showReasoning, setShowReasoning] = useState(false);
+  const [details, setDetails] = useState<ChatMessageDetails | null>(null);
+  const [loadingDetails, setLoadingDetails] = useState(false);
   const isUser = message.role === "user";
+  const reasoning = details ? details.reasoning : message.reasoning;
+  const toolsUsed = details ? details.tools_used : message.tools_used;
+  const detailsPending = !!loadDetails && !details;
+
+  const toggleReasoning = async () => {
+    if (!showReasoning && loadDetails && !details) {
+      setLoadingDetails(true);
+      try {
+        setDetails(await loadDetails());
+      } catch (error) {
+        console.error("Error loading message details:", error);
+      } finally {
+        setLoadingDetails(false);
+      }
+    }
+    setShowReasoning(!showReasoning);
+  };
 
   return (
     <div className={`flex ${isUser ? "justify-end" : "justify-start"} mb-4`}>
@@ -26,13 +47,19 @@ export function ChatMessage({ message }: ChatMessageProps) {
           <CardContent className="p-4">
             <div className="whitespace-pre-wrap text-sm">{message.content}</div>
             
-            {!isUser && (message.tools_used && message.tools_used.length > 0 || message.reasoning) && (
+            {!isUser && (toolsUsed && toolsUsed.length > 0 || reasoning || detailsPending) && (
               <div className="mt-3 pt-3 border-t">
                 <button
-                  onClick={() => setShowReasoning(!showReasoning)}
+                  onClick={toggleReasoning}
+                  disabled={loadingDetails}
                   className="flex items-center space-x-2 text-xs text-gray-500 hover:text-gray-700"
                 >
-                  {showReasoning ? (
+                  {loadingDetails ? (
+                    <>
+                      <Loader2 className="h-3 w-3 animate-spin" />
+                      <span>Loading reasoning</span>
+                    </>
+                  ) : showReasoning ? (
                     <>
                       <ChevronUp className="h-3 w-3" />
                       <span>Hide reasoning</span>
@@ -47,11 +74,11 @@ export function ChatMessage({ message }: ChatMessageProps) {
                 
                 {showReasoning && (
                   <div className="mt-2 space-y-2">
-                    {message.tools_used && message.tools_used.length > 0 && (
+                    {toolsUsed && toolsUsed.length > 0 && (
                       <div>
                         <div className="text-xs font-semibold text-gray-600 mb-1">Tools Used:</div>
                         <div className="flex flex-wrap gap-1">
-                          {message.tools_used.map((tool, idx) => (
+                          {toolsUsed.map((tool, idx) => (
                             <span
                               key={idx}
                               className="px-2 py-1 bg-blue-100 text-blue-800 text-xs rounded"
@@ -63,11 +90,11 @@ export function ChatMessage({ message }: ChatMessageProps) {
                       </div>
                     )}
                     
-                    {message.reasoning && Array.isArray(message.reasoning) && message.reasoning.length > 0 && (
+                    {reasoning && Array.isArray(reasoning) && reasoning.length > 0 && (
                       <div>
                         <div className="text-xs font-semibold text-gray-600 mb-1">Reasoning Steps:</div>
                         <div className="space-y-2">
-                          {message.reasoning.map((step: ReasoningStep, idx: number) => (
+                          {reasoning.map((step: ReasoningStep, idx: number) => (
                             <div key={idx} className="text-xs bg-gray-50 p-2 rounded">
                               <div className="font-medium text-gray-700">{step.tool}</div>
                               {step.input && (
@@ -17,8 +17,11 @@ export function TopCandidates({ jobId }: TopCandidatesProps) {
   const [data, setData] = useState<TopCandidatesResponse | null>(null);
   const [error, setError] = useState<string | null>(null);
 
-  const fetchTopCandidates = async () => {
-    setLoading(true);
+  const runInProgress =
+    data?.evaluation_status === "pending" || data?.evaluation_status === "running";
+
+  const fetchTopCandidates = async (showLoading = true) => {
+    if (showLoading) setLoading(true);
     setError(null);
     try {
       const result = await jobsApi.getTopCandidates(jobId);
@@ -27,7 +30,7 @@ export function TopCandidates({ jobId }: TopCandidatesProps) {
       setError("Failed to fetch top candidates. Please try again.");
       console.error(err);
     } finally {
-      setLoading(false);
+      if (showLoading) setLoading(false);
     }
   };
 
@@ -36,10 +39,8 @@ export function TopCandidates({ jobId }: TopCandidatesProps) {
     setError(null);
     try {
       await jobsApi.evaluateCandidates(jobId);
-      // Wait a bit then fetch results
-      setTimeout(() => {
-        fetchTopCandidates();
-      }, 2000);
+      // Results refresh while the background run is in progress
+      await fetchTopCandidates(false);
     } catch (err) {
       setError("Failed to start evaluation. Please try again.");
       console.error(err);
@@ -52,6 +53,13 @@ export function TopCandidates({ jobId }: TopCandidatesProps) {
     fetchTopCandidates();
   }, [jobId]);
 
+  // Poll while an evaluation run is pending or running
+  useEffect(() => {
+    if (!runInProgress) return;
+    const timer = setTimeout(() => fetchTopCandidates(false), 3000);
+    return () => clearTimeout(timer);
+  }, [data, runInProgress]);
+
   if (loading) {
     return (
       <Card>
@@ -79,10 +87,10 @@ export function TopCandidates({ jobId }: TopCandidatesProps) {
           </div>
           <Button
             onClick={handleEvaluate}
-            disabled={evaluating}
+            disabled={evaluating || runInProgress}
             variant="outline"
           >
-            {evaluating ? (
+            {evaluating || runInProgress ? (
               <>
                 <Loader2 className="mr-2 h-4 w-4 animate-spin" />
                 Evaluating...
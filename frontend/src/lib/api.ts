@@ -38,6 +38,7 @@ export interface TopCandidatesResponse {
   job_id: number;
   total_candidates: number;
   top_5: EvaluationResponse[];
+  evaluation_status?: 'pending' | 'running' | 'completed' | 'failed' | null;
 }
 
 export interface ReasoningStep {
@@ -73,6 +74,19 @@ export interface ChatHistoryMessage {
 export interface ChatHistoryResponse {
   session_id: string;
   messages: ChatHistoryMessage[];
+  next_cursor?: string | null;
+}
+
+export interface ChatHistoryOptions {
+  cursor?: string;
+  limit?: number;
+  include_details?: boolean;
+}
+
+export interface ChatMessageDetails {
+  id: number;
+  reasoning?: ReasoningStep[] | null;
+  tools_used?: string[] | null;
 }
 
 export const jobsApi = {
@@ -100,7 +114,7 @@ export const jobsApi = {
     return response.data;
   },
 
-  evaluateCandidates: async (jobId: number): Promise<{ job_id: number; status: string; message: string }> => {
+  evaluateCandidates: async (jobId: number): Promise<{ job_id: number; status: string; message: string; run_id?: number }> => {
     const response = await api.post(`/api/jobs/${jobId}/evaluate`);
     return response.data;
   },
@@ -117,8 +131,13 @@ export const chatApi = {
     return response.data;
   },
 
-  getHistory: async (sessionId: string): Promise<ChatHistoryResponse> => {
-    const response = await api.get<ChatHistoryResponse>(`/api/chat/sessions/${sessionId}`);
+  getHistory: async (sessionId: string, options: ChatHistoryOptions = {}): Promise<ChatHistoryResponse> => {
+    const response = await api.get<ChatHistoryResponse>(`/api/chat/sessions/${sessionId}`, { params: options });
+    return response.data;
+  },
+
+  getMessageDetails: async (sessionId: string, messageId: number): Promise<ChatMessageDetails> => {
+    const response = await api.get<ChatMessageDetails>(`/api/chat/sessions/${sessionId}/messages/${messageId}`);
     return response.data;
   },
 